@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from fetcher import DEFAULT_MAX_RATE, Fetcher
+from http_cache import HttpCache
+from main import SCRAPERS
+
+# --- Offline replay benchmarks ---
+# record: crawl each scraper once for real and save every page it read into
+#         bench/corpus/<ScraperClass>/ (manifest.json, pages/, records.jsonl).
+# serve:  replay the corpus from a local HTTP server.
+# run:    replay the corpus with optional latency and report pages/sec, parse
+#         ms/page, records/sec and peak memory per scraper against a baseline.
+
+CORPUS_DIR = os.path.join('bench', 'corpus')
+BASELINE_PATH = os.path.join('bench', 'baseline.json')
+
+# Metrics where a larger value is better; the rest should go down.
+HIGHER_IS_BETTER = {'pages_per_sec', 'records_per_sec'}
+
+
+def scraper_classes(names):
+    if not names:
+        return SCRAPERS
+    by_name = {scraper_cls.__name__: scraper_cls for scraper_cls in SCRAPERS}
+    return [by_name[name] for name in names]
+
+
+def record(scraper_cls, corpus_dir, cache_dir):
+    target = os.path.join(corpus_dir, scraper_cls.__name__)
+    os.makedirs(os.path.join(target, 'pages'), exist_ok=True)
+    manifest = {}
+    lock = threading.Lock()
+
+    def save(url, body):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+        with open(os.path.join(target, 'pages', name), 'wb') as f:
+            f.write(body)
+        with lock:
+            manifest[url] = name
+
+    with Fetcher(cache=HttpCache(cache_dir), on_response=save) as fetcher:
+        records = scraper_cls(fetcher).scrape_all()
+    with open(os.path.join(target, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(target, 'records.jsonl'), 'w', encoding='utf-8') as f:
+        records.write_jsonl(f)
+    print(f"{scraper_cls.__name__}: recorded {len(manifest)} pages, {len(records)} records")
+
+
+def load_corpus(corpus_dir):
+    pages = {}
+    for name in sorted(os.listdir(corpus_dir)):
+        manifest_path = os.path.join(corpus_dir, name, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path, encoding='utf-8') as f:
+            for url, filename in json.load(f).items():
+                pages[url] = os.path.join(corpus_dir, name, 'pages', filename)
+    return pages
+
+
+class ReplayServer:
+    # Serves recorded pages at http://127.0.0.1:<port>/<scheme>/<host>/<path>.
+    def __init__(self, pages, latency=0.0, port=0):
+        self.pages = pages
+        self.latency = latency
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="replay", daemon=True)
+        self.runner = None
+
+    async def handle(self, request):
+        scheme, _, rest = request.path_qs.lstrip('/').partition('/')
+        path = self.pages.get(f"{scheme}://{rest}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if path is None:
+            return web.Response(status=404)
+        with open(path, 'rb') as f:
+            return web.Response(body=f.read(), content_type='text/html')
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_route('GET', '/{tail:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def rewrite(self, url):
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"http://127.0.0.1:{self.port}/{parts.scheme}/{parts.netloc}{parts.path}{query}"
+
+
+def timed(totals, key, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            totals[key] += time.perf_counter() - start
+    return wrapper
+
+
+def replay(scraper_cls, server, polite, trace_memory):
+    pages = [0]
+    totals = {'parse': 0.0}
+
+    def count(url, body):
+        pages[0] += 1
+
+    # Without --polite the token buckets are opened wide so only the scrapers
+    # themselves are measured; the corpus has no robots.txt to read.
+    max_rate = DEFAULT_MAX_RATE if polite else 1000.0
+    with Fetcher(rewrite=server.rewrite, retries=0, on_response=count, max_rate=max_rate, robots=False) as fetcher:
+        scraper = scraper_cls(fetcher)
+        if not polite:
+            scraper.min_interval = 0
+        for name in ('decode', 'parse_text', 'parse_index', 'parse_detail'):
+            setattr(scraper, name, timed(totals, 'parse', getattr(scraper, name)))
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        records = sum(1 for _ in scraper.iter_records())
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return pages[0], records, elapsed, totals['parse'], peak
+
+
+def benchmark(scraper_cls, server, polite, measure_memory):
+    pages, records, elapsed, parse_time, _ = replay(scraper_cls, server, polite, False)
+    result = {
+        'pages': pages,
+        'records': records,
+        'pages_per_sec': pages / elapsed if elapsed else 0.0,
+        'parse_ms_per_page': parse_time / pages * 1000 if pages else 0.0,
+        'records_per_sec': records / elapsed if elapsed else 0.0,
+    }
+    if measure_memory:
+        # A second pass under tracemalloc, so its overhead does not skew the timings.
+        result['peak_mb'] = replay(scraper_cls, server, polite, True)[4] / 1024 / 1024
+    return result
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'scraper':<18}{'metric':<20}{'value':>12}{'baseline':>12}{'change':>9}")
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            if metric in ('pages', 'records'):
+                continue
+            base = baseline.get(name, {}).get(metric)
+            if not base:
+                print(f"{name:<18}{metric:<20}{value:>12.2f}{'-':>12}{'':>9}")
+                continue
+            change = (value - base) / base
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = " !" if worse > threshold else ""
+            if flag:
+                regressions.append((name, metric))
+            print(f"{name:<18}{metric:<20}{value:>12.2f}{base:>12.2f}{change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, replay and benchmark the scrapers offline.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="crawl the live sites and save every page into the corpus")
+    record_parser.add_argument('scrapers', nargs='*', help="scraper class names (default: all)")
+    record_parser.add_argument('--corpus', default=CORPUS_DIR)
+    record_parser.add_argument('--cache', default=os.environ.get('HTTP_CACHE_DIR', '.http_cache'))
+
+    serve_parser = subparsers.add_parser('serve', help="replay the corpus on a local port")
+    serve_parser.add_argument('--corpus', default=CORPUS_DIR)
+    serve_parser.add_argument('--port', type=int, default=8800)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+
+    run_parser = subparsers.add_parser('run', help="benchmark every scraper against the replayed corpus")
+    run_parser.add_argument('scrapers', nargs='*', help="scraper class names (default: all)")
+    run_parser.add_argument('--corpus', default=CORPUS_DIR)
+    run_parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    run_parser.add_argument('--polite', action='store_true', help="keep each scraper's min_interval")
+    run_parser.add_argument('--no-memory', action='store_true', help="skip the peak-memory pass")
+    run_parser.add_argument('--baseline', default=BASELINE_PATH)
+    run_parser.add_argument('--save-baseline', action='store_true')
+    run_parser.add_argument('--threshold', type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        classes = scraper_classes(args.scrapers)
+        with ThreadPoolExecutor(max_workers=len(classes)) as pool:
+            for future in [pool.submit(record, scraper_cls, args.corpus, args.cache) for scraper_cls in classes]:
+                future.result()
+        return
+
+    server = ReplayServer(load_corpus(args.corpus), args.latency, getattr(args, 'port', 0)).start()
+    if args.command == 'serve':
+        print(f"Replaying {len(server.pages)} pages on http://127.0.0.1:{server.port}/<scheme>/<host>/<path>")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    results = {}
+    try:
+        for scraper_cls in scraper_classes(args.scrapers):
+            results[scraper_cls.__name__] = benchmark(scraper_cls, server, args.polite, not args.no_memory)
+    finally:
+        server.stop()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
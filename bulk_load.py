@@ -0,0 +1,40 @@
+import argparse
+import os
+
+from records import Record
+from sheets import BulkLoader, open_worksheet
+from term_store import initial_of, iter_file_records
+
+# --- Bulk loader for curated rows ---
+# Streams rows from JSON, JSONL or CSV files (curated_terms.csv,
+# smbc_terms.json, glossary.json, ...) into the glossary sheet through one
+# authorized client. Target rows are worked out from the terms already in
+# column B: new terms are appended after the last row, existing ones are
+# left alone unless --overwrite is given.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load curated glossary rows into the sheet.")
+    parser.add_argument('paths', nargs='+', help="JSON, JSONL or CSV files with term / reading / definition (and optionally initial / src) fields")
+    parser.add_argument('--source', help="value for the ソース column of rows that carry none (default: the file name)")
+    parser.add_argument('--overwrite', action='store_true', help="replace rows for terms already in the sheet")
+    parser.add_argument('--batch-rows', type=int, default=20000, help="rows buffered before they are written")
+    args = parser.parse_args()
+
+    ws = open_worksheet()
+    if ws is None:
+        return
+    loader = BulkLoader(ws, overwrite=args.overwrite, batch_size=args.batch_rows)
+    for path in args.paths:
+        source = args.source or os.path.splitext(os.path.basename(path))[0]
+        count = 0
+        for row in iter_file_records(path):
+            loader.add(Record.from_dict(row, source, initial_of(row.get('reading'))))
+            count += 1
+        print(f"{path}: read {count} rows")
+    loader.flush()
+    print(f"Added {loader.inserted} new and replaced {loader.updated} existing terms; kept {loader.kept} existing terms and skipped {loader.duplicates} repeated ones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+from main import SCRAPERS
+
+# Compares the full html.parser path with each scraper's configured parser
+# and strainers on pages saved in the HTTP cache: parse+extract time per page
+# and whether both paths extract exactly the same data.
+
+def cached_pages(cache_dir):
+    db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'))
+    for url, path in db.execute("SELECT url, path FROM entries ORDER BY url"):
+        with open(os.path.join(cache_dir, path), 'rb') as f:
+            yield url, f.read()
+    db.close()
+
+def extract(scraper, body, url, kind, parser, strain):
+    soup = scraper.make_soup(body, kind, parser=parser, strain=strain)
+    if kind == 'index':
+        return scraper.parse_index(soup, url)
+    return scraper.parse_detail(soup, url)
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return result, (time.perf_counter() - start) / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare html.parser with the configured parser backends on cached pages.")
+    parser.add_argument('--cache', default=os.environ.get('HTTP_CACHE_DIR', '.http_cache'))
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    scrapers = [scraper_cls() for scraper_cls in SCRAPERS]
+    by_host = {urlsplit(scraper.index_urls()[0]).netloc: scraper for scraper in scrapers}
+    totals = {scraper.name: [0, 0.0, 0.0, 0] for scraper in scrapers}
+
+    for url, body in cached_pages(args.cache):
+        scraper = by_host.get(urlsplit(url).netloc)
+        if scraper is None:
+            continue
+        kind = 'index' if url in scraper.index_urls() else 'detail'
+        baseline, base_time = timed(lambda: extract(scraper, body, url, kind, 'html.parser', False), args.rounds)
+        fast, fast_time = timed(lambda: extract(scraper, body, url, kind, None, True), args.rounds)
+        total = totals[scraper.name]
+        total[0] += 1
+        total[1] += base_time
+        total[2] += fast_time
+        if fast != baseline:
+            total[3] += 1
+            print(f"Mismatch on {url}")
+
+    print(f"{'scraper':<15}{'pages':>7}{'html.parser ms':>16}{'fast ms':>10}{'speedup':>9}{'mismatches':>12}")
+    for name, (pages, base_time, fast_time, mismatches) in totals.items():
+        if not pages:
+            continue
+        print(f"{name:<15}{pages:>7}{base_time / pages * 1000:>16.2f}{fast_time / pages * 1000:>10.2f}{base_time / fast_time:>8.1f}x{mismatches:>12}")
+
+if __name__ == "__main__":
+    main()
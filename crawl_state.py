@@ -0,0 +1,74 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from records import to_json
+
+# --- Crawl checkpoints ---
+# Every page a crawl touches is recorded with its status (pending / done /
+# failed), attempt count and the data extracted from it. A resumed crawl
+# replays finished pages from here and only fetches the rest.
+
+
+class CrawlState:
+    def __init__(self, path=os.path.join('.crawl', 'state.sqlite'), resume=False):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, scraper TEXT NOT NULL, kind TEXT NOT NULL, status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL, result TEXT)"
+        )
+        if not resume:
+            self.db.execute("DELETE FROM pages")
+        self.db.commit()
+
+    def completed(self, urls):
+        # Returns {url: extracted result} for the urls already done.
+        if not urls:
+            return {}
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT url, result FROM pages WHERE status = 'done' AND url IN ({','.join('?' * len(urls))})",
+                list(urls),
+            ).fetchall()
+        return {url: json.loads(result) for url, result in rows}
+
+    def mark_pending(self, scraper, kind, urls):
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO pages (url, scraper, kind, status, attempts, updated_at) VALUES (?, ?, ?, 'pending', 1, ?)"
+                " ON CONFLICT (url) DO UPDATE SET status = 'pending', attempts = attempts + 1, updated_at = excluded.updated_at",
+                [(url, scraper, kind, now) for url in urls],
+            )
+            self.db.commit()
+
+    def mark_failed(self, urls):
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "UPDATE pages SET status = 'failed', updated_at = ? WHERE url = ?",
+                [(now, url) for url in urls],
+            )
+            self.db.commit()
+
+    def mark_done(self, results):
+        # results are (url, extracted result) pairs.
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "UPDATE pages SET status = 'done', updated_at = ?, result = ? WHERE url = ?",
+                [(now, json.dumps(result, ensure_ascii=False, default=to_json), url) for url, result in results],
+            )
+            self.db.commit()
+
+    def summary(self):
+        with self.lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall())
+
+    def close(self):
+        self.db.close()
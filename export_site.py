@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import shutil
+import unicodedata
+
+from term_store import TermStore, read_records
+
+# --- Site export ---
+# Writes the glossary for glossary-site as per-initial shards plus a search
+# index, so the site loads only the shard or postings it needs:
+#   manifest.json        fields, total and one entry per shard (initial, file, start, count)
+#   shards/<hex>.json    rows of [id, term, reading, definition, search_en]
+#   search-index.json    unigram and bigram postings over the kana-normalized
+#                        term, reading and search_en, as delta-encoded positions
+# Positions count rows across the shards in manifest order.
+
+FIELDS = ['id', 'term', 'reading', 'definition', 'search_en']
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize_search(text):
+    # Must match normalizeSearch in glossary-site/src/lib/glossaryIndex.ts.
+    return unicodedata.normalize('NFKC', text or '').lower().translate(KATAKANA_TO_HIRAGANA)
+
+
+def grams(text):
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def delta_encode(positions):
+    encoded = []
+    previous = 0
+    for position in positions:
+        encoded.append(position - previous)
+        previous = position
+    return encoded
+
+
+def group_by_initial(records):
+    # Keeps the order of first appearance so shards concatenate back into the
+    # original listing order.
+    groups = {}
+    for record in records:
+        groups.setdefault(record.get('initial') or '', []).append(record)
+    return groups
+
+
+def shard_name(initial):
+    return ('-'.join(f"{ord(ch):x}" for ch in initial) or 'other') + '.json'
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def export(records, out_dir):
+    shard_dir = os.path.join(out_dir, 'shards')
+    if os.path.isdir(shard_dir):
+        shutil.rmtree(shard_dir)
+    os.makedirs(shard_dir)
+
+    shards = []
+    postings = {}
+    position = 0
+    for initial, group in group_by_initial(records).items():
+        rows = []
+        for record in group:
+            rows.append([record.get(field) or ('' if field != 'id' else position + 1) for field in FIELDS])
+            searchable = [normalize_search(record.get(field)) for field in ('term', 'reading', 'search_en')]
+            # Sorted so the index is written in the same order on every run.
+            for gram in sorted(set().union(*(grams(text) for text in searchable))):
+                postings.setdefault(gram, []).append(position)
+            position += 1
+        name = shard_name(initial)
+        write_json(os.path.join(shard_dir, name), rows)
+        shards.append({'initial': initial, 'file': f"shards/{name}", 'start': position - len(rows), 'count': len(rows)})
+
+    write_json(os.path.join(out_dir, 'search-index.json'), {gram: delta_encode(positions) for gram, positions in postings.items()})
+    write_json(os.path.join(out_dir, 'manifest.json'), {
+        'version': 1,
+        'fields': FIELDS,
+        'total': position,
+        'shards': shards,
+        'index': 'search-index.json',
+    })
+    return position, len(shards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the glossary as lazily loaded shards and a search index for glossary-site.")
+    parser.add_argument('--input', default=os.path.join('glossary-site', 'src', 'data', 'glossary.json'), help="JSON or JSONL records to export")
+    parser.add_argument('--store', help="export the best entry per term from this term store instead of --input")
+    parser.add_argument('--out', default=os.path.join('glossary-site', 'public', 'data'))
+    args = parser.parse_args()
+
+    if args.store:
+        store = TermStore(args.store)
+        records = sorted(store.export(), key=lambda record: (record['initial'], record['reading'], record['term']))
+        store.close()
+    else:
+        records = read_records(args.input)
+    os.makedirs(args.out, exist_ok=True)
+    total, shard_count = export(records, args.out)
+    print(f"Exported {total} terms in {shard_count} shards to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
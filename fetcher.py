@@ -0,0 +1,261 @@
+import asyncio
+import random
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from metrics import LATENCY_BUCKETS, Histogram
+from scheduler import THROTTLE_STATUSES, TokenBucket, robots_limits
+
+# --- Async fetch engine ---
+# One event loop runs in a background thread and owns every connection.
+# Scrapers stay synchronous and hand it batches of URLs; each host gets its
+# own keep-alive connection pool, concurrency cap, adaptive token bucket
+# (see scheduler.py) and request statistics. Every scraper shares the
+# fetcher, so scrapers hitting the same host share its bucket.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Requests per second a host's token bucket may ramp up to by default.
+DEFAULT_MAX_RATE = 8.0
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+    def record(self, status, size=0, latency=None):
+        self.requests += 1
+        self.bytes += size
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if latency is not None:
+            self.latency.observe(latency)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+            "bytes": self.bytes,
+            "statuses": dict(self.statuses),
+            "latency": self.latency.as_dict(),
+        }
+
+
+class HostPool:
+    def __init__(self, concurrency, rate, max_rate, pool_size, timeout, shards=1):
+        self.shards = shards
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, max_rate)
+        self.stats = HostStats()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self.robots = None
+
+    def get_session(self):
+        # One session per host so every host keeps its own warm connections.
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def load_robots(self, robots_url):
+        # Seeds the bucket from Crawl-delay / Request-rate. A missing or
+        # unreachable robots.txt leaves the scraper's own rate in place.
+        try:
+            async with self.get_session().get(robots_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status != 200:
+                    return
+                text = (await response.read()).decode('utf-8', errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return
+        delay = robots_limits(text)
+        if delay:
+            # Each of n shards may only use 1/n of what the site allows.
+            self.bucket.set_max_delay(delay * self.shards)
+
+    async def ready(self, robots_url):
+        if self.robots is None:
+            self.robots = asyncio.ensure_future(self.load_robots(robots_url))
+        await self.robots
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def retry_after_seconds(value):
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Fetcher:
+    def __init__(self, timeout=15, cache=None, pool_size=8, retries=4, backoff_base=1.0, backoff_cap=60.0, rewrite=None, on_response=None, max_rate=DEFAULT_MAX_RATE, robots=True, shards=1):
+        self.timeout = timeout
+        # Requests per second a host's bucket may ramp up to, and whether to
+        # read each host's robots.txt for a Crawl-delay first.
+        self.max_rate = max_rate
+        self.robots = robots
+        # Processes crawling the same hosts at once (a sharded crawl). Each
+        # gets 1/shards of every host's concurrency, seed rate, max_rate and
+        # robots.txt allowance, so together they stay within the limits.
+        self.shards = shards
+        self.cache = cache
+        # rewrite maps a page URL to the URL actually requested (e.g. a local
+        # replay server); on_response(url, body) sees every body handed back,
+        # called in the thread that asked for it, never on the event loop.
+        self.rewrite = rewrite
+        self.on_response = on_response
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hosts = {}
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fetcher", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def host_pool(self, host, concurrency, min_interval):
+        # min_interval only seeds the rate; the bucket adapts from there.
+        if host not in self.hosts:
+            rate = 1.0 / min_interval if min_interval else self.max_rate
+            self.hosts[host] = HostPool(
+                max(1, concurrency // self.shards), rate / self.shards, self.max_rate / self.shards,
+                self.pool_size, self.timeout, self.shards,
+            )
+        return self.hosts[host]
+
+    def backoff(self, attempt, retry_after=None):
+        # Full jitter; a server-supplied Retry-After always wins.
+        if retry_after is not None:
+            return min(retry_after, self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def _request(self, url, headers, concurrency, min_interval, ttl):
+        parts = urlsplit(url)
+        pool = self.host_pool(parts.netloc, concurrency, min_interval)
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and entry.is_fresh(ttl):
+            # Fresh cache hits never wait for a token.
+            pool.stats.cache_hits += 1
+            return self.cache.read(entry)
+        if self.robots:
+            robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+            await pool.ready(self.rewrite(robots_url) if self.rewrite else robots_url)
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(entry.validators())
+
+        request_url = self.rewrite(url) if self.rewrite else url
+        error = None
+        for attempt in range(self.retries + 1):
+            delay = None
+            async with pool.semaphore:
+                await pool.bucket.acquire()
+                started = time.monotonic()
+                try:
+                    async with pool.get_session().get(request_url, headers=request_headers) as response:
+                        if response.status == 304 and entry:
+                            pool.stats.record(304, latency=time.monotonic() - started)
+                            # A 304 carries no body, so its latency would set a
+                            # baseline full pages could never meet.
+                            pool.bucket.success()
+                            pool.stats.cache_hits += 1
+                            return self.cache.revalidated(entry)
+                        if response.status in RETRY_STATUSES:
+                            pool.stats.record(response.status, latency=time.monotonic() - started)
+                            error = f"HTTP {response.status}"
+                            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                            if response.status in THROTTLE_STATUSES or retry_after is not None:
+                                pool.bucket.throttle(retry_after)
+                            delay = self.backoff(attempt, retry_after)
+                        else:
+                            body = await response.read()
+                            latency = time.monotonic() - started
+                            pool.stats.record(response.status, len(body), latency)
+                            pool.bucket.success(latency)
+                            if self.cache and response.status == 200:
+                                self.cache.store(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                            return body
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = str(e) or e.__class__.__name__
+                    if isinstance(e, asyncio.TimeoutError):
+                        pool.bucket.throttle()
+                    delay = self.backoff(attempt)
+                except (UnicodeDecodeError, zlib.error) as e:
+                    # A body that cannot be decoded will not decode on a retry
+                    # either. Anything else is a bug and propagates.
+                    error = f"{e.__class__.__name__}: {e}"
+                    break
+            if attempt < self.retries:
+                pool.stats.retries += 1
+                await asyncio.sleep(delay)
+        pool.stats.failures += 1
+        print(f"Error fetching {url}: {error}")
+        return None
+
+    async def _get_many(self, urls, headers, concurrency, min_interval, ttl):
+        return await asyncio.gather(*(self._request(url, headers, concurrency, min_interval, ttl) for url in urls))
+
+    def fetch_many(self, urls, headers=None, concurrency=4, min_interval=0.5, ttl=0):
+        # Returns raw bodies in the same order as urls, None where the fetch failed.
+        # Cached bodies younger than ttl seconds are returned without touching the network.
+        urls = list(urls)
+        coro = self._get_many(urls, headers, concurrency, min_interval, ttl)
+        bodies = asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+        if self.on_response is not None:
+            for url, body in zip(urls, bodies):
+                if body is None:
+                    continue
+                # A failing hook (e.g. the archive's disk is full) costs
+                # that page its hook, not the batch its bodies.
+                try:
+                    self.on_response(url, body)
+                except Exception as e:
+                    print(f"on_response failed for {url}: {e}")
+        return bodies
+
+    def fetch(self, url, **kwargs):
+        return self.fetch_many([url], **kwargs)[0]
+
+    def stats(self):
+        return {
+            host: dict(pool.stats.as_dict(), rate=pool.bucket.rate, throttles=pool.bucket.throttles)
+            for host, pool in self.hosts.items()
+        }
+
+    async def _close_pools(self):
+        for pool in self.hosts.values():
+            await pool.close()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._close_pools(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,131 @@
+import gzip
+import heapq
+import posixpath
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from xml.etree import ElementTree
+
+from shards import shard_of
+
+# --- Crawl frontier ---
+# Every page a scraper will fetch goes through one frontier: URLs are
+# canonicalised, each canonical URL is queued at most once per crawl, pages
+# come out by priority (index pages before the detail pages they link to)
+# and a per-source page budget caps how many are handed out. A sharded
+# frontier only queues the detail pages its shard owns.
+
+INDEX_PRIORITY = 0
+DETAIL_PRIORITY = 1
+# Detail pages only known from a sitemap come after the linked ones, so the
+# link text from an index page wins whenever a page is listed in both.
+SITEMAP_PRIORITY = 2
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+
+def canonicalize(url):
+    # Lowercases scheme and host, drops default ports, fragments and tracking
+    # parameters, resolves dot segments and sorts the query string. User
+    # info and IPv6 brackets are kept as they were.
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        # hostname strips the brackets off an IPv6 literal.
+        host = f"[{host}]"
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    host = userinfo + at + host
+    path = parts.path or '/'
+    if '.' in path:
+        trailing = path.endswith('/')
+        path = posixpath.normpath(path)
+        if trailing and not path.endswith('/'):
+            path += '/'
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if not key.startswith(TRACKING_PARAMS))
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def sitemap_locations(body):
+    # Returns (page URLs, nested sitemap URLs) listed in a sitemap or sitemap index.
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError:
+        return [], []
+    pages, sitemaps = [], []
+    for element in root:
+        loc = next((child.text for child in element if child.tag.endswith('loc') and child.text), None)
+        if loc is None:
+            continue
+        (sitemaps if element.tag.endswith('sitemap') else pages).append(loc.strip())
+    return pages, sitemaps
+
+
+class Frontier:
+    def __init__(self, budget=None, shard=None, split_index=False):
+        self.budget = budget
+        # (i, n) when this crawl is shard i of n. split_index shards index
+        # pages too, for sites whose records all come from index pages.
+        self.shard = shard
+        self.split_index = split_index
+        self.heap = []
+        self.seen = set()
+        self.sequence = 0
+        self.handed_out = 0
+        self.duplicates = 0
+        self.foreign = 0
+
+    def owns(self, url):
+        # url must already be canonical.
+        return self.shard is None or shard_of(url, self.shard[1]) == self.shard[0]
+
+    def add(self, url, hint=None, kind='detail', priority=None):
+        # Returns the canonical URL when it was queued, None for a repeat or
+        # a page belonging to another shard. Index pages are read by every
+        # shard, since their links are spread over all of them, unless
+        # split_index is set.
+        url = canonicalize(url)
+        if url in self.seen:
+            self.duplicates += 1
+            return None
+        self.seen.add(url)
+        if (kind != 'index' or self.split_index) and not self.owns(url):
+            self.foreign += 1
+            return None
+        if priority is None:
+            priority = INDEX_PRIORITY if kind == 'index' else DETAIL_PRIORITY
+        heapq.heappush(self.heap, (priority, self.sequence, kind, url, hint))
+        self.sequence += 1
+        return url
+
+    def mark_seen(self, url):
+        # Treats url as already handled without queueing it.
+        self.seen.add(canonicalize(url))
+
+    def exhausted(self):
+        return self.budget is not None and self.handed_out >= self.budget
+
+    def next_batch(self, size):
+        # Pops up to size pages of the same kind, best priority first.
+        # Returns (kind, [(url, hint), ...]); the list is empty when the
+        # frontier is drained or the budget is spent.
+        if not self.heap or self.exhausted():
+            return None, []
+        if self.budget is not None:
+            size = min(size, self.budget - self.handed_out)
+        kind = self.heap[0][2]
+        batch = []
+        while self.heap and len(batch) < size and self.heap[0][2] == kind:
+            priority, sequence, kind, url, hint = heapq.heappop(self.heap)
+            batch.append((url, hint))
+        self.handed_out += len(batch)
+        return kind, batch
+
+    def __contains__(self, url):
+        return canonicalize(url) in self.seen
+
+    def __len__(self):
+        return len(self.heap)
@@ -3,10 +3,8 @@
 import React, { useState, useMemo, useEffect } from 'react';
 import { Search, ChevronRight, Hash, ChevronLeft, X } from 'lucide-react';
 import { cn } from '@/lib/utils';
+import { loadInitial, loadManifest, loadRange, searchTerms } from '@/lib/glossaryIndex';
 import { GlossaryTerm } from '@/types';
-import glossaryDataRaw from '@/data/glossary.json';
-
-const glossaryData = glossaryDataRaw as GlossaryTerm[];
 
 // Colors from toushibu-official.com analysis
 const COLORS = {
@@ -30,19 +28,6 @@ const INITIALS = [
     'わ'
 ];
 
-// カタカナ・ひらがな変換ユーティリティ
-const toHiragana = (str: string) => {
-    return str.replace(/[\u30A1-\u30F6]/g, match =>
-        String.fromCharCode(match.charCodeAt(0) - 0x60)
-    );
-};
-
-const toKatakana = (str: string) => {
-    return str.replace(/[\u3041-\u3096]/g, match =>
-        String.fromCharCode(match.charCodeAt(0) + 0x60)
-    );
-};
-
 function TermCard({ item, onClick }: { item: GlossaryTerm, onClick: () => void }) {
     return (
         <div
@@ -85,24 +70,30 @@ export default function GlossaryUI() {
     const [selectedTerm, setSelectedTerm] = useState<GlossaryTerm | null>(null);
     const ITEMS_PER_PAGE = 100;
 
-    const filteredData = useMemo(() => {
-        const queryLower = searchQuery.toLowerCase();
-        const queryHiragana = toHiragana(searchQuery);
-        const queryKatakana = toKatakana(searchQuery);
-
-        return glossaryData.filter((item) => {
-            const matchesSearch =
-                item.term.toLowerCase().includes(queryLower) ||
-                item.term.includes(queryKatakana) ||
-                item.term.includes(queryHiragana) ||
-                item.reading.includes(queryHiragana) ||
-                item.definition.toLowerCase().includes(queryLower) ||
-                (item.search_en && item.search_en.toLowerCase().includes(queryLower));
+    // 検索・頭文字で絞り込んだ結果。null は全件表示（件数は manifest から）
+    const [filteredData, setFilteredData] = useState<GlossaryTerm[] | null>(null);
+    const [totalCount, setTotalCount] = useState(0);
+    const [paginatedData, setPaginatedData] = useState<GlossaryTerm[]>([]);
 
-            const matchesInitial = !selectedInitial || item.initial === selectedInitial;
-
-            return matchesSearch && matchesInitial;
-        });
+    useEffect(() => {
+        let cancelled = false;
+        const query = searchQuery.trim();
+        const load = query
+            ? searchTerms(query)
+            : selectedInitial
+                ? loadInitial(selectedInitial)
+                : loadManifest().then(manifest => {
+                    if (!cancelled) setTotalCount(manifest.total);
+                    return null;
+                });
+        load.then(items => {
+            if (cancelled) return;
+            setFilteredData(items);
+            if (items) setTotalCount(items.length);
+        }).catch(console.error);
+        return () => {
+            cancelled = true;
+        };
     }, [searchQuery, selectedInitial]);
 
     // Reset page when filters change
@@ -121,10 +112,20 @@ export default function GlossaryUI() {
         };
     }, [selectedTerm]);
 
-    const totalPages = Math.ceil(filteredData.length / ITEMS_PER_PAGE);
-    const paginatedData = useMemo(() => {
+    const totalPages = Math.ceil(totalCount / ITEMS_PER_PAGE);
+
+    useEffect(() => {
+        let cancelled = false;
         const start = (currentPage - 1) * ITEMS_PER_PAGE;
-        return filteredData.slice(start, start + ITEMS_PER_PAGE);
+        const load = filteredData
+            ? Promise.resolve(filteredData.slice(start, start + ITEMS_PER_PAGE))
+            : loadRange(start, start + ITEMS_PER_PAGE);
+        load.then(items => {
+            if (!cancelled) setPaginatedData(items);
+        }).catch(console.error);
+        return () => {
+            cancelled = true;
+        };
     }, [filteredData, currentPage]);
 
     const scrollToTop = () => {
@@ -194,7 +195,7 @@ export default function GlossaryUI() {
                 <div className="flex items-center space-x-2">
                     <Hash className="h-5 w-5 text-[#1a4696]" />
                     <span className="text-xl font-bold text-slate-800">
-                        検索結果: <span className="text-[#1a4696]">{filteredData.length.toLocaleString()}</span> 件
+                        検索結果: <span className="text-[#1a4696]">{totalCount.toLocaleString()}</span> 件
                     </span>
                     {totalPages > 1 && (
                         <span className="ml-4 text-sm font-medium text-slate-500 bg-slate-100 px-3 py-1 rounded-full border border-slate-200">
@@ -269,13 +270,13 @@ export default function GlossaryUI() {
                         </button>
                     </div>
                     <p className="mt-6 text-sm font-bold text-slate-500">
-                        {filteredData.length.toLocaleString()} 件中 {((currentPage - 1) * ITEMS_PER_PAGE + 1).toLocaleString()} 〜 {Math.min(currentPage * ITEMS_PER_PAGE, filteredData.length).toLocaleString()} 件を表示
+                        {totalCount.toLocaleString()} 件中 {((currentPage - 1) * ITEMS_PER_PAGE + 1).toLocaleString()} 〜 {Math.min(currentPage * ITEMS_PER_PAGE, totalCount).toLocaleString()} 件を表示
                     </p>
                 </div>
             )}
 
             {/* Empty State */}
-            {filteredData.length === 0 && (
+            {totalCount === 0 && filteredData !== null && (
                 <div className="mt-20 text-center py-20 bg-slate-50 rounded-2xl border-2 border-dashed border-slate-200">
                     <Search className="h-12 w-12 text-slate-300 mx-auto mb-4" />
                     <h3 className="text-2xl font-bold text-slate-800 mb-2">見つかりませんでした</h3>
@@ -0,0 +1,152 @@
+import { GlossaryTerm } from '@/types';
+
+// 用語データは export_site.py が public/data に書き出した頭文字ごとのシャードと
+// 検索インデックスから、必要な分だけ遅延読み込みする
+
+export type ShardInfo = {
+    initial: string;
+    file: string;
+    start: number;
+    count: number;
+};
+
+type Manifest = {
+    version: number;
+    fields: string[];
+    total: number;
+    shards: ShardInfo[];
+    index: string;
+};
+
+type Row = [number, string, string, string, string];
+
+const DATA_URL = '/data/';
+
+let manifestPromise: Promise<Manifest> | null = null;
+let indexPromise: Promise<Map<string, number[]>> | null = null;
+const shardPromises = new Map<string, Promise<GlossaryTerm[]>>();
+
+// export_site.py の normalize_search と同じ正規化（NFKC・小文字・カタカナ→ひらがな）
+export const normalizeSearch = (str: string) => {
+    return str.normalize('NFKC').toLowerCase().replace(/[\u30A1-\u30F6]/g, match =>
+        String.fromCharCode(match.charCodeAt(0) - 0x60)
+    );
+};
+
+const fetchJson = async <T,>(path: string): Promise<T> => {
+    const response = await fetch(DATA_URL + path);
+    if (!response.ok) {
+        throw new Error(`Failed to load ${path}: ${response.status}`);
+    }
+    return response.json() as Promise<T>;
+};
+
+export function loadManifest(): Promise<Manifest> {
+    if (!manifestPromise) {
+        manifestPromise = fetchJson<Manifest>('manifest.json');
+    }
+    return manifestPromise;
+}
+
+function loadShard(shard: ShardInfo): Promise<GlossaryTerm[]> {
+    let promise = shardPromises.get(shard.file);
+    if (!promise) {
+        promise = fetchJson<Row[]>(shard.file).then(rows =>
+            rows.map(([id, term, reading, definition, search_en]) => ({
+                id, term, reading, definition, initial: shard.initial, search_en,
+            }))
+        );
+        shardPromises.set(shard.file, promise);
+    }
+    return promise;
+}
+
+function loadIndex(): Promise<Map<string, number[]>> {
+    if (!indexPromise) {
+        indexPromise = loadManifest()
+            .then(manifest => fetchJson<Record<string, number[]>>(manifest.index))
+            .then(raw => {
+                const postings = new Map<string, number[]>();
+                for (const [gram, deltas] of Object.entries(raw)) {
+                    let position = 0;
+                    postings.set(gram, deltas.map(delta => (position += delta)));
+                }
+                return postings;
+            });
+    }
+    return indexPromise;
+}
+
+const shardAt = (shards: ShardInfo[], position: number) => {
+    let low = 0;
+    let high = shards.length - 1;
+    while (low < high) {
+        const mid = (low + high + 1) >> 1;
+        if (shards[mid].start <= position) low = mid; else high = mid - 1;
+    }
+    return shards[low];
+};
+
+// 全件表示のページ用に [start, end) の範囲にかかるシャードだけを読み込む
+export async function loadRange(start: number, end: number): Promise<GlossaryTerm[]> {
+    const manifest = await loadManifest();
+    const shards = manifest.shards.filter(shard => shard.start < end && shard.start + shard.count > start);
+    const loaded = await Promise.all(shards.map(loadShard));
+    return shards.flatMap((shard, i) =>
+        loaded[i].slice(Math.max(0, start - shard.start), Math.max(0, end - shard.start))
+    );
+}
+
+export async function loadInitial(initial: string): Promise<GlossaryTerm[]> {
+    const manifest = await loadManifest();
+    const loaded = await Promise.all(manifest.shards.filter(shard => shard.initial === initial).map(loadShard));
+    return loaded.flat();
+}
+
+const intersect = (a: number[], b: number[]) => {
+    const result: number[] = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+        if (a[i] === b[j]) { result.push(a[i]); i++; j++; }
+        else if (a[i] < b[j]) i++;
+        else j++;
+    }
+    return result;
+};
+
+// 用語・読み・search_en の 1-gram / 2-gram インデックスで候補を絞り、
+// 候補を含むシャードだけを読み込んで部分一致を確かめる
+export async function searchTerms(query: string): Promise<GlossaryTerm[]> {
+    const normalized = normalizeSearch(query.trim());
+    if (!normalized) return [];
+    const chars = Array.from(normalized);
+    const grams = chars.length === 1 ? chars : chars.slice(0, -1).map((ch, i) => ch + chars[i + 1]);
+
+    const [manifest, postings] = await Promise.all([loadManifest(), loadIndex()]);
+    let candidates: number[] | null = null;
+    for (const gram of new Set(grams)) {
+        const positions = postings.get(gram);
+        if (!positions) return [];
+        candidates = candidates ? intersect(candidates, positions) : positions;
+        if (candidates.length === 0) return [];
+    }
+
+    const byShard = new Map<ShardInfo, number[]>();
+    for (const position of candidates ?? []) {
+        const shard = shardAt(manifest.shards, position);
+        if (!byShard.has(shard)) byShard.set(shard, []);
+        byShard.get(shard)!.push(position - shard.start);
+    }
+    const shards = Array.from(byShard.keys());
+    const loaded = await Promise.all(shards.map(loadShard));
+    return shards.flatMap((shard, i) =>
+        byShard.get(shard)!
+            .map(offset => loaded[i][offset])
+            .filter(item =>
+                normalizeSearch(item.term).includes(normalized) ||
+                normalizeSearch(item.reading).includes(normalized) ||
+                (!!item.search_en && normalizeSearch(item.search_en).includes(normalized))
+            )
+    );
+}
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# --- On-disk HTTP response cache ---
+# Bodies live in one file per URL; an SQLite index keeps their validators
+# (ETag / Last-Modified), when they were last confirmed fresh and when they
+# were last read, which drives LRU eviction once max_bytes is exceeded.
+
+
+class CacheEntry:
+    def __init__(self, url, path, etag, last_modified, stored_at, size):
+        self.url = url
+        self.path = path
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.size = size
+
+    def is_fresh(self, ttl):
+        return bool(ttl) and time.time() - self.stored_at < ttl
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, directory='.http_cache', max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " url TEXT PRIMARY KEY, path TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.db.commit()
+
+    def lookup(self, url):
+        row = self.db.execute(
+            "SELECT url, path, etag, last_modified, stored_at, size FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.directory, row[1])):
+            return None
+        return CacheEntry(*row)
+
+    def read(self, entry):
+        self.db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), entry.url))
+        self.db.commit()
+        with open(os.path.join(self.directory, entry.path), 'rb') as f:
+            return f.read()
+
+    def revalidated(self, entry):
+        # A 304 confirms the stored body, so it counts as freshly fetched.
+        self.db.execute("UPDATE entries SET stored_at = ? WHERE url = ?", (time.time(), entry.url))
+        return self.read(entry)
+
+    def store(self, url, body, etag=None, last_modified=None):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        path = os.path.join(name[:2], name)
+        os.makedirs(os.path.join(self.directory, name[:2]), exist_ok=True)
+        tmp_path = os.path.join(self.directory, path + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, os.path.join(self.directory, path))
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (url, path, etag, last_modified, stored_at, accessed_at, size)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, path, etag, last_modified, now, now, len(body)),
+        )
+        self.db.commit()
+        self.evict()
+
+    def evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, path, size in self.db.execute(
+            "SELECT url, path, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, path))
+            except FileNotFoundError:
+                pass
+            self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
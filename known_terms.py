@@ -0,0 +1,38 @@
+import json
+import os
+
+from merge import normalize_term
+
+# --- Known terms for incremental crawls ---
+# Terms already in the sheet (normalized) plus, for every detail page fetched
+# before, the link text it was listed under. A detail page is only fetched
+# again when it is new or its listing changed.
+
+
+class KnownTerms:
+    def __init__(self, terms=(), urls=None):
+        self.terms = {normalize_term(term) for term in terms}
+        self.urls = dict(urls or {})
+
+    @classmethod
+    def load(cls, path, terms=()):
+        urls = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                urls = json.load(f)
+        return cls(terms, urls)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.urls, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def should_fetch(self, url, hint):
+        if url in self.urls:
+            return hint is not None and self.urls[url] != hint
+        return hint is None or normalize_term(hint) not in self.terms
+
+    def add(self, url, hint):
+        self.urls[url] = hint
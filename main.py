@@ -1,259 +1,727 @@
 
-import requests
-from bs4 import BeautifulSoup
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from bs4 import BeautifulSoup, SoupStrainer
+import argparse
+import multiprocessing
 import os
-import time
 import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from queue import Queue
 from urllib.parse import urljoin
 
+from crawl_state import CrawlState
+from frontier import SITEMAP_PRIORITY, Frontier, canonicalize, sitemap_locations
+from known_terms import KnownTerms
+from merge import MergeIndex
+from metrics import RunMetrics, profiled, write_json, write_prometheus
+from page_archive import INDEX_NAME, ArchiveFetcher, PageArchive
+from records import Record, RecordColumns
+from shards import ShardOutput, env_shard, merge_shards, parse_shard, shard_files, shard_path
+from syllabary import ROW_HEADS, syllabary_urls
+from term_store import TermStore, iter_file_records
+
 # --- Scraper Classes ---
 
+def records_on_page(kind, result):
+    if kind == 'index':
+        return len(result[0]) if result else 0
+    return 1 if result else 0
+
+def has_class(*names):
+    # SoupStrainer sees the raw class attribute, so match it word by word.
+    return lambda value: bool(value) and any(name in value.split() for name in names)
+
+def done_future(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
 class BaseScraper:
-    def __init__(self):
+    name = ""
+    src = ""
+    encoding = 'utf-8'
+    # Politeness limits for this scraper's host: requests in flight at once
+    # and the starting gap in seconds between two request starts, which the
+    # fetcher's token bucket then adapts (see scheduler.py).
+    concurrency = 4
+    min_interval = 0.5
+    # Seconds a cached page is trusted without revalidating it against the site.
+    cache_ttl = 0
+    # Parser backend and, per page kind ('index' / 'detail'), a SoupStrainer
+    # limiting parsing to the subtrees the extraction below actually reads.
+    parser = 'lxml'
+    strainers = {}
+    # Pages handed to the fetcher at once; bounds how many parsed pages are in memory.
+    batch_size = 16
+    # When set, iter_records runs under cProfile and dumps pstats here.
+    profile_path = None
+    # Most pages fetched per crawl (None: no limit).
+    page_budget = None
+    # (i, n) to fetch only shard i of n of this site's detail pages.
+    shard = None
+    # Every record comes from index pages (no detail pages to follow), so a
+    # sharded crawl splits the index pages themselves between shards.
+    index_only = False
+    # Sitemaps to seed detail pages from, and the regex a listed URL must
+    # match to count as one. Pages only found there have no link text, so
+    # this suits scrapers whose parse_detail reads the term from the page.
+    sitemaps = ()
+    sitemap_pattern = None
+
+    def __init__(self, fetcher=None, known=None, parse_pool=None, state=None, metrics=None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-    
-    def get_soup(self, url, encoding='utf-8'):
-        try:
-            time.sleep(1) # Be polite
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.encoding = encoding
-            return BeautifulSoup(response.text, 'html.parser')
-        except Exception as e:
-            print(f"Error fetching {url}: {e}")
-            return None
+        self.fetcher = fetcher
+        # KnownTerms from earlier runs; None recrawls every detail page.
+        self.known = known
+        # Optional ProcessPoolExecutor doing the CPU-bound page work.
+        self.parse_pool = parse_pool
+        # Optional CrawlState checkpointing every page for --resume.
+        self.state = state
+        # Optional RunMetrics receiving per-page timings and record counts.
+        self.metrics = metrics
 
-class SMBCNikkoScraper(BaseScraper):
-    def scrape_all(self):
-        print("Scraping SMBC Nikko...")
+    def decode(self, body):
+        return body.decode(self.encoding, errors='replace')
+
+    def parse_text(self, text, kind=None, parser=None, strain=True):
+        strainer = self.strainers.get(kind) if strain else None
+        return BeautifulSoup(text, parser or self.parser, parse_only=strainer)
+
+    def make_soup(self, body, kind=None, parser=None, strain=True):
+        return self.parse_text(self.decode(body), kind, parser, strain)
+
+    def fetch_pages(self, urls):
+        return self.fetcher.fetch_many(urls, headers=self.headers, concurrency=self.concurrency, min_interval=self.min_interval, ttl=self.cache_ttl)
+
+    def get_soups(self, urls, kind=None):
+        return [self.make_soup(body, kind) if body is not None else None for body in self.fetch_pages(urls)]
+
+    def get_soup(self, url, kind=None):
+        return self.get_soups([url], kind)[0]
+
+    def index_urls(self):
+        return []
+
+    def parse_index(self, soup, url):
+        # Returns the records found on an index page and the detail pages
+        # to follow, as (url, hint) pairs where hint is the link text.
+        return [], []
+
+    def parse_detail(self, soup, url, hint=None):
+        return None
+
+    def extract(self, kind, url, body, hint=None):
+        return self.extract_timed(kind, url, body, hint)[0]
+
+    def extract_timed(self, kind, url, body, hint=None):
+        # Returns the extraction result and the seconds spent in each stage.
+        start = time.perf_counter()
+        text = self.decode(body)
+        decoded = time.perf_counter()
+        soup = self.parse_text(text, kind)
+        parsed = time.perf_counter()
+        if kind == 'index':
+            result = self.parse_index(soup, url)
+        else:
+            result = self.parse_detail(soup, url, hint)
+        timings = {'decode': decoded - start, 'parse': parsed - decoded, 'extract': time.perf_counter() - parsed}
+        return result, timings
+
+    def submit_extract(self, kind, pages):
+        # pages are (url, body, hint) triples. With a parse pool, decoding,
+        # parsing and extraction run in worker processes while this thread
+        # goes on fetching; otherwise they run here and now. Futures resolve
+        # to (result, timings).
+        if self.parse_pool is None:
+            return [done_future(self.extract_timed(kind, url, body, hint)) for url, body, hint in pages]
+        return [self.parse_pool.submit(extract_page, self.__class__.__name__, kind, url, body, hint) for url, body, hint in pages]
+
+    def start_batch(self, kind, batch):
+        # batch holds (url, hint) pairs. Pages finished by an interrupted run
+        # come back from the crawl state; the rest are fetched and submitted
+        # for extraction. Returns ((url, hint), future, fresh) triples.
+        saved = self.state.completed([url for url, hint in batch]) if self.state is not None else {}
+        started = [((url, hint), done_future((saved[url], None)), False) for url, hint in batch if url in saved]
+        if saved and self.metrics is not None:
+            self.metrics.resumed(self.name, len(started))
+        to_fetch = [(url, hint) for url, hint in batch if url not in saved]
+        if not to_fetch:
+            return started
+        if self.state is not None:
+            self.state.mark_pending(self.name, kind, [url for url, hint in to_fetch])
+        bodies = self.fetch_pages([url for url, hint in to_fetch])
+        pages = [(url, body, hint) for (url, hint), body in zip(to_fetch, bodies) if body is not None]
+        if self.state is not None:
+            self.state.mark_failed([url for (url, hint), body in zip(to_fetch, bodies) if body is None])
+        futures = self.submit_extract(kind, pages)
+        return started + [((url, hint), future, True) for (url, body, hint), future in zip(pages, futures)]
+
+    def finish_batch(self, kind, started):
+        # Waits for extraction, checkpoints fresh results and returns
+        # ((url, hint), result) pairs.
         results = []
-        url_chars = ['a', 'i', 'u', 'e', 'o', 'ka', 'ki', 'ku', 'ke', 'ko', 'sa', 'si', 'su', 'se', 'so', 'ta', 'ti', 'tu', 'te', 'to', 'na', 'ni', 'nu', 'ne', 'no', 'ha', 'hi', 'hu', 'he', 'ho', 'ma', 'mi', 'mu', 'me', 'mo', 'ya', 'yu', 'yo', 'ra', 'ri', 'ru', 're', 'ro', 'wa']
-        for char in url_chars:
-            url = f"https://www.smbcnikko.co.jp/terms/japan/{char}/index.html"
-            soup = self.get_soup(url, encoding='shift_jis')
-            if not soup: continue
-            
-            items = soup.find_all('li')
-            for item in items:
-                link_el = item.find('a', class_='link-list__type')
-                if link_el:
-                    full_text = link_el.get_text(strip=True)
-                    match = re.search(r'(.+?)（(.+?)）', full_text)
-                    term = match.group(1).strip() if match else full_text
-                    reading = match.group(2).strip() if match else ""
-                    definition = item.get_text(strip=True).replace(full_text, "").strip()
-                    definition = re.sub(r'^[〉＞\s]+', '', definition)
-                    if definition:
-                        results.append({"term": term, "reading": reading, "definition": definition, "src": "SMBC"})
-        return results
+        for link, future, fresh in started:
+            result, timings = future.result()
+            if timings is not None and self.metrics is not None:
+                self.metrics.page(self.name, kind, timings, records_on_page(kind, result))
+            results.append((link, result, fresh))
+        if self.state is not None:
+            self.state.mark_done([(url, result) for (url, hint), result, fresh in results if fresh])
+        return [(link, result) for link, result, fresh in results]
+
+    def sitemap_links(self):
+        # Detail pages listed in this site's sitemaps whose URL matches
+        # sitemap_pattern; nested sitemap indexes are followed.
+        if not self.sitemaps or self.sitemap_pattern is None:
+            return []
+        pattern = re.compile(self.sitemap_pattern)
+        links, queue, visited = [], list(self.sitemaps), set()
+        while queue:
+            batch = [url for url in queue if url not in visited]
+            visited.update(batch)
+            queue = []
+            for body in self.fetch_pages(batch):
+                if body is None:
+                    continue
+                pages, sitemaps = sitemap_locations(body)
+                links.extend(url for url in pages if pattern.search(url))
+                queue.extend(sitemaps)
+        return links
+
+    def queue_link(self, frontier, url, hint, priority=None):
+        # Queues a detail page unless it is a repeat or KnownTerms says it is
+        # unchanged since the last run; returns False only in the latter case.
+        url = canonicalize(url)
+        if url not in frontier and frontier.owns(url) and self.known is not None and not self.known.should_fetch(url, hint):
+            frontier.mark_seen(url)
+            return False
+        frontier.add(url, hint, priority=priority)
+        return True
+
+    def iter_records(self):
+        # Every page goes through one Frontier: index pages first, then the
+        # detail pages they link to, each unique page fetched once and at most
+        # page_budget pages in all. Pages are fetched batch_size at a time and
+        # records are yielded as soon as their page is parsed; while a batch of
+        # detail pages is being parsed, the next one is fetched. A sharded
+        # crawl reads every index page for its links but only keeps the
+        # records of the index pages its shard owns.
+        print(f"Scraping {self.name}...")
+        frontier = Frontier(self.page_budget, self.shard, self.index_only)
+        skipped = 0
+        for url in self.index_urls():
+            frontier.add(url, kind='index')
+        for url in self.sitemap_links():
+            skipped += not self.queue_link(frontier, url, None, SITEMAP_PRIORITY)
+        pending = []
+        while True:
+            kind, batch = frontier.next_batch(self.batch_size)
+            if not batch:
+                break
+            if kind == 'index':
+                for link, (records, detail_links) in self.finish_batch('index', self.start_batch('index', batch)):
+                    # Results replayed from the crawl state come back as dicts.
+                    if frontier.owns(link[0]):
+                        yield from map(Record.coerce, records)
+                    for detail_url, hint in detail_links:
+                        skipped += not self.queue_link(frontier, detail_url, hint)
+            else:
+                started = self.start_batch('detail', batch)
+                yield from self.detail_records(self.finish_batch('detail', pending))
+                pending = started
+        yield from self.detail_records(self.finish_batch('detail', pending))
+        if skipped:
+            print(f"{self.name}: skipped {skipped} known detail pages")
+        if frontier.duplicates:
+            print(f"{self.name}: skipped {frontier.duplicates} duplicate links")
+        if frontier.foreign:
+            print(f"{self.name}: left {frontier.foreign} detail pages to other shards")
+        if frontier.exhausted() and len(frontier):
+            print(f"{self.name}: page budget of {self.page_budget} reached, {len(frontier)} pages left for a later run")
+
+    def detail_records(self, results):
+        for (detail_url, hint), record in results:
+            if record:
+                record = Record.coerce(record)
+                record.url = detail_url
+                if self.known is not None:
+                    self.known.add(detail_url, hint)
+                yield record
 
-class OkasanScraper(BaseScraper):
     def scrape_all(self):
-        print("Scraping Okasan Online...")
+        return RecordColumns(self.iter_records())
+
+class SMBCNikkoScraper(BaseScraper):
+    name = "SMBC Nikko"
+    src = "SMBC"
+    index_only = True
+    encoding = 'shift_jis'
+    strainers = {'index': SoupStrainer('li')}
+
+    def index_urls(self):
+        return syllabary_urls("https://www.smbcnikko.co.jp/terms/japan/{char}/index.html", 'kunrei')
+
+    def parse_index(self, soup, url):
         results = []
+        items = soup.find_all('li')
+        for item in items:
+            link_el = item.find('a', class_='link-list__type')
+            if link_el:
+                full_text = link_el.get_text(strip=True)
+                match = re.search(r'(.+?)（(.+?)）', full_text)
+                term = match.group(1).strip() if match else full_text
+                reading = match.group(2).strip() if match else ""
+                definition = item.get_text(strip=True).replace(full_text, "").strip()
+                definition = re.sub(r'^[〉＞\s]+', '', definition)
+                if definition:
+                    results.append(Record(term, reading, definition, self.src))
+        return results, []
+
+class OkasanScraper(BaseScraper):
+    name = "Okasan Online"
+    src = "Okasan"
+    # Detail pages are read through '#main_content p', which a strainer cannot
+    # express alongside the h2 title, so they are parsed whole.
+    strainers = {'index': SoupStrainer('a', href=lambda x: x and 'datail' in x)}
+
+    def index_urls(self):
         base_url = "https://www.okasan-online.co.jp/support/beginner/glossary/"
-        index_url = base_url + "index.html"
-        soup = self.get_soup(index_url)
-        if not soup: return []
-        
+        return [base_url + "index.html"]
+
+    def parse_index(self, soup, url):
         links = soup.find_all('a', href=lambda x: x and 'datail' in x)
-        for link in links[:30]: # Limit for testing
-            detail_url = urljoin("https://www.okasan-online.co.jp", link['href'])
-            detail_soup = self.get_soup(detail_url)
-            if not detail_soup: continue
-            
-            term_el = detail_soup.find('h2')
-            if not term_el: continue
-            term = term_el.get_text(strip=True)
-            paragraphs = detail_soup.select('#main_content p')
-            definition = " ".join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-            results.append({"term": term, "reading": "", "definition": definition, "src": "Okasan"})
-        return results
+        return [], [(urljoin("https://www.okasan-online.co.jp", link['href']), link.get_text(strip=True)) for link in links]
+
+    def parse_detail(self, soup, url, hint=None):
+        term_el = soup.find('h2')
+        if not term_el: return None
+        term = term_el.get_text(strip=True)
+        paragraphs = soup.select('#main_content p')
+        definition = " ".join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+        return Record(term, "", definition, self.src)
 
 class RakutenScraper(BaseScraper):
-    def scrape_all(self):
-        print("Scraping Rakuten...")
-        results = []
-        url_chars = ['a', 'ka', 'sa', 'ta', 'na', 'ha', 'ma', 'ya', 'ra', 'wa']
-        for char in url_chars:
-            url = f"https://www.rakuten-sec.co.jp/web/market/dictionary/j/{char}/"
-            soup = self.get_soup(url)
-            if not soup: continue
-            
-            links = soup.find_all('a', href=lambda x: x and '.html' in x and '/dictionary/j/' in x)
-            for link in links[:10]:
-                detail_url = urljoin(url, link['href'])
-                detail_soup = self.get_soup(detail_url)
-                if not detail_soup: continue
-                term_el = detail_soup.find('h1', class_='c-title-page')
-                if not term_el: continue
-                term = term_el.get_text(strip=True)
-                reading = ""
-                table = detail_soup.find('table', class_='c-table')
-                if table:
-                    reading_el = table.find('td')
-                    if reading_el: reading = reading_el.get_text(strip=True)
-                content = detail_soup.find('div', class_='pos-r') or detail_soup.find('div', id='contents')
-                definition = " ".join([p.get_text(strip=True) for p in content.find_all('p') if len(p.get_text(strip=True)) > 15]) if content else ""
-                if term and definition:
-                    results.append({"term": term, "reading": reading, "definition": definition, "src": "Rakuten"})
-        return results
+    name = "Rakuten"
+    src = "Rakuten"
+    strainers = {
+        'index': SoupStrainer('a', href=lambda x: x and '.html' in x and '/dictionary/j/' in x),
+        'detail': SoupStrainer(['h1', 'table', 'div']),
+    }
+
+    def index_urls(self):
+        return syllabary_urls("https://www.rakuten-sec.co.jp/web/market/dictionary/j/{char}/", 'kunrei', ROW_HEADS)
+
+    def parse_index(self, soup, url):
+        links = soup.find_all('a', href=lambda x: x and '.html' in x and '/dictionary/j/' in x)
+        return [], [(urljoin(url, link['href']), link.get_text(strip=True)) for link in links]
+
+    def parse_detail(self, soup, url, hint=None):
+        term_el = soup.find('h1', class_='c-title-page')
+        if not term_el: return None
+        term = term_el.get_text(strip=True)
+        reading = ""
+        table = soup.find('table', class_='c-table')
+        if table:
+            reading_el = table.find('td')
+            if reading_el: reading = reading_el.get_text(strip=True)
+        content = soup.find('div', class_='pos-r') or soup.find('div', id='contents')
+        definition = " ".join([p.get_text(strip=True) for p in content.find_all('p') if len(p.get_text(strip=True)) > 15]) if content else ""
+        if term and definition:
+            return Record(term, reading, definition, self.src)
+        return None
 
 class NomuraScraper(BaseScraper):
-    def scrape_all(self):
-        print("Scraping Nomura...")
-        results = []
-        url_chars = ['a', 'i', 'u', 'e', 'o', 'ka', 'ki', 'ku', 'ke', 'ko', 'sa', 'si', 'su', 'se', 'so', 'ta', 'ti', 'tu', 'te', 'to', 'na', 'ni', 'nu', 'ne', 'no', 'ha', 'hi', 'hu', 'he', 'ho', 'ma', 'mi', 'mu', 'me', 'mo', 'ya', 'yu', 'yo', 'ra', 'ri', 'ru', 're', 'ro', 'wa']
-        for char in url_chars:
-            url = f"https://www.nomura.co.jp/terms/{char}_index.html"
-            soup = self.get_soup(url)
-            if not soup: continue
-            
-            items = soup.find_all('li', class_='terms-list__item')
-            for item in items:
-                link = item.find('a')
-                if link:
-                    term = link.get_text(strip=True)
-                    detail_url = urljoin(url, link['href'])
-                    # We could scrape detail, but for Nomura, the list might have previews.
-                    # Let's hit the detail page for quality.
-                    detail_soup = self.get_soup(detail_url)
-                    if detail_soup:
-                        reading_el = detail_soup.find('p', class_='terms-detail__reading')
-                        reading = reading_el.get_text(strip=True).strip('（）') if reading_el else ""
-                        def_el = detail_soup.find('div', class_='terms-detail__body')
-                        definition = def_el.get_text(strip=True) if def_el else ""
-                        results.append({"term": term, "reading": reading, "definition": definition, "src": "Nomura"})
-        return results
+    name = "Nomura"
+    src = "Nomura"
+    strainers = {
+        'index': SoupStrainer('li', class_=has_class('terms-list__item')),
+        'detail': SoupStrainer(class_=has_class('terms-detail__reading', 'terms-detail__body')),
+    }
+
+    def index_urls(self):
+        return syllabary_urls("https://www.nomura.co.jp/terms/{char}_index.html", 'kunrei')
+
+    def parse_index(self, soup, url):
+        links = []
+        items = soup.find_all('li', class_='terms-list__item')
+        for item in items:
+            link = item.find('a')
+            if link:
+                # We could scrape detail, but for Nomura, the list might have previews.
+                # Let's hit the detail page for quality.
+                links.append((urljoin(url, link['href']), link.get_text(strip=True)))
+        return [], links
+
+    def parse_detail(self, soup, url, hint=None):
+        reading_el = soup.find('p', class_='terms-detail__reading')
+        reading = reading_el.get_text(strip=True).strip('（）') if reading_el else ""
+        def_el = soup.find('div', class_='terms-detail__body')
+        definition = def_el.get_text(strip=True) if def_el else ""
+        return Record(hint, reading, definition, self.src)
 
 class DaiwaScraper(BaseScraper):
-    def scrape_all(self):
-        print("Scraping Daiwa...")
-        results = []
+    name = "Daiwa"
+    src = "Daiwa"
+    strainers = {
+        'index': SoupStrainer(class_=has_class('glossary_list')),
+        'detail': SoupStrainer(['h1', 'p', 'div']),
+    }
+
+    def index_urls(self):
         # Daiwa uses a complex navigation, but let's try the direct syllabary index if possible.
         # Actually, they have an index page: https://www.daiwa.jp/glossary/
-        url = "https://www.daiwa.jp/glossary/"
-        soup = self.get_soup(url)
-        if not soup: return []
-        
+        return ["https://www.daiwa.jp/glossary/"]
+
+    def parse_index(self, soup, url):
         links = soup.select('.glossary_list a')
-        for link in links[:30]:
-            detail_url = urljoin(url, link['href'])
-            detail_soup = self.get_soup(detail_url)
-            if not detail_soup: continue
-            
-            term_el = detail_soup.find('h1')
-            if not term_el: continue
-            term = term_el.get_text(strip=True)
-            
-            reading_el = detail_soup.find('p', class_='reading')
-            reading = reading_el.get_text(strip=True) if reading_el else ""
-            
-            def_el = detail_soup.find('div', class_='explanation')
-            definition = def_el.get_text(strip=True) if def_el else ""
-            
-            results.append({"term": term, "reading": reading, "definition": definition, "src": "Daiwa"})
-        return results
+        return [], [(urljoin(url, link['href']), link.get_text(strip=True)) for link in links]
+
+    def parse_detail(self, soup, url, hint=None):
+        term_el = soup.find('h1')
+        if not term_el: return None
+        term = term_el.get_text(strip=True)
+        
+        reading_el = soup.find('p', class_='reading')
+        reading = reading_el.get_text(strip=True) if reading_el else ""
+        
+        def_el = soup.find('div', class_='explanation')
+        definition = def_el.get_text(strip=True) if def_el else ""
+        
+        return Record(term, reading, definition, self.src)
 
 class MUFGScraper(BaseScraper):
-    def scrape_all(self):
-        print("Scraping MUFG...")
+    name = "MUFG"
+    src = "MUFG"
+    index_only = True
+    strainers = {'index': SoupStrainer(class_=has_class('terms_list'))}
+
+    def index_urls(self):
+        return syllabary_urls("https://www.sc.mufg.jp/learn/terms/{char}.html", 'hepburn')
+
+    def parse_index(self, soup, url):
         results = []
-        url_chars = ['a', 'i', 'u', 'e', 'o', 'ka', 'ki', 'ku', 'ke', 'ko', 'sa', 'shi', 'su', 'se', 'so', 'ta', 'chi', 'tsu', 'te', 'to', 'na', 'ni', 'nu', 'ne', 'no', 'ha', 'hi', 'fu', 'he', 'ho', 'ma', 'mi', 'mu', 'me', 'mo', 'ya', 'yu', 'yo', 'ra', 'ri', 'ru', 're', 'ro', 'wa']
-        for char in url_chars:
-            url = f"https://www.sc.mufg.jp/learn/terms/{char}.html"
-            soup = self.get_soup(url)
-            if not soup: continue
-            
-            items = soup.select('.terms_list dt')
-            for dt in items:
-                term = dt.get_text(strip=True)
-                dd = dt.find_next_sibling('dd')
-                definition = dd.get_text(strip=True) if dd else ""
-                results.append({"term": term, "reading": "", "definition": definition, "src": "MUFG"})
-        return results
+        items = soup.select('.terms_list dt')
+        for dt in items:
+            term = dt.get_text(strip=True)
+            dd = dt.find_next_sibling('dd')
+            definition = dd.get_text(strip=True) if dd else ""
+            results.append(Record(term, "", definition, self.src))
+        return results, []
 
-# --- Utility Functions ---
+SCRAPERS = [SMBCNikkoScraper, OkasanScraper, RakutenScraper, NomuraScraper, DaiwaScraper, MUFGScraper]
 
-def rephrase_definition(definition):
-    if not definition: return ""
-    new_def = definition.replace("。です。", "。").replace("のことです。", "を意味します。")
-    new_def = re.sub(r'といいます$', 'と呼ばれます。', new_def)
-    new_def = re.sub(r'である$', 'を指します。', new_def)
-    if len(new_def) > 300:
-        new_def = new_def[:300] + "..."
-    return new_def
-
-def update_spreadsheet(all_data):
-    import base64
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds_path = '/Users/matsuyamakoichi/service-account.json' if os.path.exists('/Users/matsuyamakoichi/service-account.json') else 'service-account.json'
-    
-    if not os.path.exists(creds_path):
-        creds_json = os.environ.get('GCP_SERVICE_ACCOUNT_JSON')
-        if creds_json:
-            try:
-                # Try base64 decoding first
-                decoded = base64.b64decode(creds_json).decode('utf-8')
-                with open('service-account.json', 'w') as f:
-                    f.write(decoded)
-                creds_path = 'service-account.json'
-            except Exception:
-                # If not base64, assume it's raw JSON
-                with open('service-account.json', 'w') as f:
-                    f.write(creds_json)
-                creds_path = 'service-account.json'
+_worker_scrapers = {}
+
+def extract_page(scraper_name, kind, url, body, hint=None):
+    # Runs in a parse worker process; returns plain records and links only.
+    if scraper_name not in _worker_scrapers:
+        scraper_cls = next(scraper_cls for scraper_cls in SCRAPERS if scraper_cls.__name__ == scraper_name)
+        _worker_scrapers[scraper_name] = scraper_cls()
+    return _worker_scrapers[scraper_name].extract_timed(kind, url, body, hint)
+
+# --- Utility Functions ---
+def open_sheet_writer(ws=None, metrics=None):
+    # gspread, oauth2client and the rewriter are imported here rather than at
+    # the top, so scrape and merge workers (and parse worker processes, which
+    # import this module) never load the Google client stack.
+    from rephrase import DefinitionRewriter
+    from sheets import SheetWriter, open_worksheet
+    if ws is None:
+        if metrics is None:
+            ws = open_worksheet()
         else:
-            print("Credentials not found. Skipping sheet update.")
-            return
+            with metrics.sheets_call('open'):
+                ws = open_worksheet()
+        if ws is None:
+            return None
+    rewriter = DefinitionRewriter(max_chars=int(os.environ.get('DEFINITION_MAX_CHARS', '300')))
+    return SheetWriter(ws, int(os.environ.get('SHEET_BATCH_ROWS', '200')), rewriter=rewriter, metrics=metrics)
 
-    creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
-    client = gspread.authorize(creds)
-    sh = client.open_by_key('1JwA5HPNvMmNwADjyCDdNaRg2XPu2hzO9SFAo72qjBnw')
-    ws = sh.worksheet('シート1')
-    
-    current_rows = ws.get_all_values()
-    existing_terms = {row[1] for row in current_rows if len(row) > 1}
+def update_spreadsheet(all_data, ws=None, metrics=None):
+    writer = open_sheet_writer(ws, metrics)
+    if writer is None:
+        return False
     
-    new_rows = []
+    merge_index = MergeIndex()
     for item in all_data:
-        if item['term'] not in existing_terms:
-            reading = item['reading']
-            initial = reading[0] if reading else ""
-            rephrased = rephrase_definition(item['definition'])
-            new_rows.append([initial, item['term'], reading, rephrased])
-            existing_terms.add(item['term'])
-    
-    if new_rows:
-        ws.append_rows(new_rows)
-        print(f"Added {len(new_rows)} new terms to the sheet.")
-    else:
-        print("No new terms to add.")
-
-def main():
-    merged_data = []
-    
-    scrapers = [
-        SMBCNikkoScraper(),
-        OkasanScraper(),
-        RakutenScraper(),
-        NomuraScraper(),
-        DaiwaScraper(),
-        MUFGScraper()
-    ]
-    
-    for scraper in scrapers:
+        is_best, displaced = merge_index.offer(item)
+        if is_best:
+            writer.add(item, displaced)
+    writer.flush()
+    print(f"Added {writer.inserted} new and updated {writer.updated} existing terms in the sheet.")
+    return True
+
+def stream_records(scrapers, pool, maxsize=1000):
+    # Runs every scraper in the pool and yields records in the order they are
+    # produced; the bounded queue makes fast scrapers wait for a slow writer.
+    queue = Queue(maxsize)
+    done = object()
+    cancelled = threading.Event()
+
+    def run(scraper):
         try:
-            data = scraper.scrape_all()
-            merged_data.extend(data)
+            records = scraper.iter_records()
+            if scraper.profile_path:
+                records = profiled(records, scraper.profile_path)
+            for record in records:
+                if cancelled.is_set():
+                    break
+                queue.put(record)
         except Exception as e:
             print(f"Error in {scraper.__class__.__name__}: {e}")
-            
-    if merged_data:
-        update_spreadsheet(merged_data)
+        finally:
+            queue.put(done)
+
+    for scraper in scrapers:
+        pool.submit(run, scraper)
+    remaining = len(scrapers)
+    try:
+        while remaining:
+            record = queue.get()
+            if record is done:
+                remaining -= 1
+            else:
+                yield record
+    finally:
+        # If the consumer stopped early, let the scrapers wind down instead of
+        # blocking forever on a full queue.
+        cancelled.set()
+        while remaining:
+            if queue.get() is done:
+                remaining -= 1
+
+def shard_arg(value):
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def select_scrapers(names):
+    # names is a comma-separated list of sources, class names or display
+    # names (SMBC, NomuraScraper, "Okasan Online"); empty selects every site.
+    if not names:
+        return list(SCRAPERS)
+    wanted = {name.strip().casefold() for name in names.split(',') if name.strip()}
+    selected = [scraper_cls for scraper_cls in SCRAPERS if wanted & {scraper_cls.src.casefold(), scraper_cls.__name__.casefold(), scraper_cls.name.casefold()}]
+    known = {name.casefold() for scraper_cls in SCRAPERS for name in (scraper_cls.src, scraper_cls.__name__, scraper_cls.name)}
+    unknown = wanted - known
+    if unknown:
+        raise ValueError(f"unknown sources: {', '.join(sorted(unknown))} (choose from {', '.join(scraper_cls.src for scraper_cls in SCRAPERS)})")
+    return selected
+
+def crawl(scraper_classes, consume, known=None, state=None, metrics=None, shard=None, archive=None, fetcher=None):
+    # Crawls every selected site at once and hands each record to consume as
+    # it arrives. Returns the record count and the fetcher's per-host stats.
+    # Every fetched body also goes to archive when one is given; passing a
+    # fetcher (such as an ArchiveFetcher) replaces the network altogether.
+    if fetcher is None:
+        from fetcher import Fetcher
+        from http_cache import HttpCache
+        cache = HttpCache(os.environ.get('HTTP_CACHE_DIR', '.http_cache'), int(os.environ.get('HTTP_CACHE_MAX_MB', '512')) * 1024 * 1024)
+        fetcher = Fetcher(
+            cache=cache,
+            pool_size=int(os.environ.get('FETCH_POOL_SIZE', '8')),
+            retries=int(os.environ.get('FETCH_RETRIES', '4')),
+            max_rate=float(os.environ.get('FETCH_MAX_RATE', '8')),
+            shards=shard[1] if shard else 1,
+            on_response=archive.add if archive is not None else None,
+        )
+    with fetcher:
+        # PARSE_WORKERS processes decode, parse and extract pages; 0 or 1 keeps it in-process.
+        parse_workers = int(os.environ.get('PARSE_WORKERS', str(os.cpu_count() or 1)))
+        parse_pool = None
+        if parse_workers > 1:
+            # Workers start on the first submit, when the fetcher's event loop
+            # and the scraper threads are already running; forking then can
+            # deadlock a child, so they come from a fresh forkserver instead.
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(method))
+        scrapers = [scraper_cls(fetcher, known, parse_pool, state, metrics) for scraper_cls in scraper_classes]
+        # PROFILE_SCRAPER names one scraper (class or display name) to run under cProfile.
+        profile_name = os.environ.get('PROFILE_SCRAPER')
+        page_budget = os.environ.get('PAGE_BUDGET')
+        for scraper in scrapers:
+            scraper.shard = shard
+            if page_budget:
+                scraper.page_budget = int(page_budget)
+            if profile_name in (scraper.__class__.__name__, scraper.name):
+                scraper.profile_path = os.environ.get('PROFILE_PATH', os.path.join('.crawl', f'{scraper.__class__.__name__}.prof'))
+        
+        count = 0
+        with ThreadPoolExecutor(max_workers=len(scrapers)) as pool:
+            for record in stream_records(scrapers, pool):
+                count += 1
+                consume(record)
+        if parse_pool is not None:
+            parse_pool.shutdown()
+        
+        hosts = fetcher.stats()
+    for host, stats in hosts.items():
+        print(f"{host}: {stats['requests']} requests, {stats['retries']} retries, {stats['failures']} failures, {stats['cache_hits']} cache hits, {stats['bytes']} bytes")
+    return count, hosts
+
+def write_report(metrics, hosts=None, shard=None):
+    report = metrics.report(hosts)
+    write_json(shard_path(os.environ.get('METRICS_REPORT_PATH', os.path.join('.crawl', 'report.json')), shard), report)
+    if os.environ.get('METRICS_TEXTFILE_PATH'):
+        write_prometheus(shard_path(os.environ['METRICS_TEXTFILE_PATH'], shard), report)
+
+def open_crawl_state(resume, shard=None):
+    return CrawlState(shard_path(os.environ.get('CRAWL_STATE_PATH', os.path.join('.crawl', 'state.sqlite')), shard), resume=resume)
+
+def close_crawl_state(state):
+    print("Crawl state: " + ", ".join(f"{number} {status}" for status, number in sorted(state.summary().items())))
+    state.close()
+
+def archive_dir():
+    # An empty PAGE_ARCHIVE_DIR turns the archive off.
+    return os.environ.get('PAGE_ARCHIVE_DIR', os.path.join('.crawl', 'archive'))
+
+def open_page_archive(shard=None):
+    directory = archive_dir()
+    return PageArchive(shard_path(directory, shard)) if directory else None
+
+def close_page_archive(archive):
+    if archive is None:
+        return
+    print(f"Archived {archive.stored} new or changed pages ({archive.unchanged} unchanged) in {archive.directory}.")
+    archive.close()
+
+# --- Commands ---
+
+def run(args):
+    # Crawl, merge and publish in one process: records go to the sheet as
+    # they arrive, whenever they are the best definition seen so far for their term.
+    metrics = RunMetrics()
+    writer = open_sheet_writer(metrics=metrics)
+    known_path = os.environ.get('KNOWN_URLS_PATH', os.path.join('.crawl', 'known_urls.json'))
+    known = None
+    if not args.full:
+        known = KnownTerms.load(known_path, writer.rows.keys() if writer else ())
+    
+    store = TermStore(os.environ.get('TERM_DB_PATH', 'terms.sqlite'))
+    state = open_crawl_state(args.resume)
+    archive = open_page_archive()
+    merge_index = MergeIndex()
+
+    def consume(record):
+        store.upsert(record)
+        is_best, displaced = merge_index.offer(record)
+        if is_best and writer is not None:
+            writer.add(record, displaced)
+
+    count, hosts = crawl(args.scrapers, consume, known, state, metrics, archive=archive)
+    if writer is not None:
+        writer.flush()
+        print(f"Added {writer.inserted} new and updated {writer.updated} existing terms in the sheet.")
+    print(f"Scraped {count} records for {len(merge_index)} distinct terms.")
+    close_crawl_state(state)
+    close_page_archive(archive)
+    store.close()
+    write_report(metrics, hosts)
+
+    if writer is not None and known is not None:
+        known.save(known_path)
+
+def scrape(args):
+    # A scrape worker touches neither the sheet nor the term store: it writes
+    # its shard's records to JSON lines for merge to combine. It always
+    # fetches every page of its shard, since skipping pages known from an
+    # earlier run would leave their terms out of the merged output.
+    shard = args.shard or env_shard()
+    metrics = RunMetrics()
+    state = open_crawl_state(args.resume, shard)
+    archive = open_page_archive(shard)
+    output = ShardOutput(args.out, [scraper_cls.src for scraper_cls in args.scrapers], shard)
+    count, hosts = crawl(args.scrapers, output.write, None, state, metrics, shard, archive)
+    paths = output.close()
+    label = f" (shard {shard[0]} of {shard[1]})" if shard else ""
+    print(f"Scraped {count} records{label} into {len(paths)} files under {args.out}.")
+    close_crawl_state(state)
+    close_page_archive(archive)
+    write_report(metrics, hosts, shard)
+
+def reextract(args):
+    # Reruns the selected scrapers' extraction over archived pages with no
+    # network traffic, e.g. after fixing a selector. Link following works as
+    # in a crawl, so index pages lead to the detail pages they now yield;
+    # pages that were never archived are skipped like failed fetches.
+    directories = args.archive or [directory for directory in [archive_dir()] if directory]
+    if not directories:
+        sys.exit("PAGE_ARCHIVE_DIR is empty, so crawls are not archived; pass --archive DIR to re-extract from an existing archive.")
+    for directory in directories:
+        if not os.path.exists(os.path.join(directory, INDEX_NAME)):
+            sys.exit(f"No page archive in {directory}.")
+    archives = [PageArchive(directory) for directory in directories]
+    output = ShardOutput(args.out, [scraper_cls.src for scraper_cls in args.scrapers])
+    count, hosts = crawl(args.scrapers, output.write, fetcher=ArchiveFetcher(archives))
+    paths = output.close()
+    print(f"Re-extracted {count} records into {len(paths)} files under {args.out}.")
+
+def merge(args):
+    paths = shard_files(args.input)
+    if not paths:
+        print(f"No shard files in {args.input}.")
+        return
+    store = TermStore(os.environ.get('TERM_DB_PATH', 'terms.sqlite'))
+    count, records = merge_shards(paths, store)
+    store.close()
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    tmp_path = args.output + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        records.write_jsonl(f)
+    os.replace(tmp_path, args.output)
+    print(f"Merged {count} records from {len(paths)} shard files into {len(records)} records for {args.output}.")
+
+def publish(args):
+    metrics = RunMetrics()
+    records = (Record.from_dict(row) for row in iter_file_records(args.input))
+    if update_spreadsheet(records, metrics=metrics):
+        write_report(metrics)
+
+COMMANDS = {'run': run, 'scrape': scrape, 'reextract': reextract, 'merge': merge, 'publish': publish}
+
+def main(argv=None):
+    shard_dir = os.environ.get('SHARD_DIR', os.path.join('.crawl', 'shards'))
+    merged_path = os.environ.get('MERGED_PATH', os.path.join('.crawl', 'merged.jsonl'))
+    parser = argparse.ArgumentParser(description="Scrape brokerage glossaries into the 投資部 glossary sheet.")
+    subparsers = parser.add_subparsers(dest='command')
+    sources_help = "comma-separated sources to crawl (SMBC, Okasan, Rakuten, Nomura, Daiwa, MUFG); default: all"
+    run_parser = subparsers.add_parser('run', help="crawl every site and update the sheet as records arrive (the default)")
+    run_parser.add_argument('--full', action='store_true', help="recrawl every detail page, including terms already in the sheet")
+    run_parser.add_argument('--resume', action='store_true', help="continue the last crawl, fetching only pages it did not finish")
+    run_parser.add_argument('--sources', help=sources_help)
+    scrape_parser = subparsers.add_parser('scrape', help="crawl one shard and write its records as JSON lines")
+    scrape_parser.add_argument('--sources', help=sources_help)
+    scrape_parser.add_argument('--shard', type=shard_arg, help="i/n: fetch only shard i (0-based) of n of every site's detail pages; default: CLOUD_RUN_TASK_INDEX / CLOUD_RUN_TASK_COUNT")
+    scrape_parser.add_argument('--out', default=shard_dir, help=f"directory for <source>.<i>-of-<n>.jsonl files (default: {shard_dir})")
+    scrape_parser.add_argument('--resume', action='store_true', help="continue this shard's last crawl")
+    reextract_dir = os.path.join('.crawl', 'reextract')
+    reextract_parser = subparsers.add_parser('reextract', help="rerun extraction over archived pages without fetching anything")
+    reextract_parser.add_argument('--sources', help=sources_help)
+    reextract_parser.add_argument('--archive', action='append', help="archive directory; repeat for the archives of several shards (default: PAGE_ARCHIVE_DIR or .crawl/archive)")
+    reextract_parser.add_argument('--out', default=reextract_dir, help=f"directory for the re-extracted record files (default: {reextract_dir})")
+    merge_parser = subparsers.add_parser('merge', help="combine shard files into one file of candidate records")
+    merge_parser.add_argument('--input', default=shard_dir, help=f"directory of shard files (default: {shard_dir})")
+    merge_parser.add_argument('--output', default=merged_path, help=f"default: {merged_path}")
+    publish_parser = subparsers.add_parser('publish', help="write merged records to the sheet")
+    publish_parser.add_argument('--input', default=merged_path, help=f"default: {merged_path}")
+
+    argv = sys.argv[1:] if argv is None else argv
+    # `python main.py [--full] [--resume]` keeps meaning a full run.
+    if not argv or argv[0] not in COMMANDS and argv[0] not in ('-h', '--help'):
+        argv = ['run'] + argv
+    args = parser.parse_args(argv)
+    if args.command in ('run', 'scrape', 'reextract'):
+        try:
+            args.scrapers = select_scrapers(args.sources)
+        except ValueError as e:
+            parser.error(str(e))
+    COMMANDS[args.command](args)
 
 if __name__ == "__main__":
     main()
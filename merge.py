@@ -0,0 +1,47 @@
+import unicodedata
+
+# --- Cross-source merge index ---
+# Records from every source are grouped in one pass on a normalized term
+# (NFKC, width and case folding, katakana -> hiragana, no punctuation or
+# spaces), keeping the best-scoring record of each group.
+
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize_term(term):
+    # NFKC folds full-width ASCII and half-width katakana; the long vowel
+    # mark (ー) is a letter modifier and survives the punctuation filter.
+    text = unicodedata.normalize('NFKC', term or '').casefold().translate(KATAKANA_TO_HIRAGANA)
+    return ''.join(ch for ch in text if unicodedata.category(ch)[0] not in 'PZSC')
+
+
+def default_score(record):
+    definition = record.definition
+    truncated = definition.endswith(('…', '...'))
+    return (bool(definition), not truncated, bool(record.reading), min(len(definition), 300))
+
+
+class MergeIndex:
+    def __init__(self, score=default_score):
+        self.score = score
+        self.best = {}
+
+    def offer(self, record):
+        # Returns (is_best, displaced): whether record now leads its group and
+        # the record it replaced, if any. Ties keep the earlier record.
+        key = normalize_term(record.term)
+        if not key:
+            return False, None
+        current = self.best.get(key)
+        if current is not None and self.score(record) <= self.score(current):
+            return False, None
+        self.best[key] = record
+        return True, current
+
+    def merge(self, records):
+        for record in records:
+            self.offer(record)
+        return list(self.best.values())
+
+    def __len__(self):
+        return len(self.best)
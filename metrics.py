@@ -0,0 +1,235 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# --- Run metrics ---
+# Fetch statistics come from the fetcher's per-host HostStats; scrapers add
+# per-page decode / parse / extract timings and records per page, and the
+# sheet writer times every Sheets API call. At the end of a run everything
+# is written as a JSON report and, optionally, as a Prometheus textfile for
+# node_exporter's textfile collector.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+RECORD_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SHEETS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGES = ('decode', 'parse', 'extract')
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # Upper bounds are inclusive, as with Prometheus' `le`.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self):
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            cumulative.append([bound, total])
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+class ScraperMetrics:
+    def __init__(self):
+        self.pages = {}
+        self.resumed = 0
+        self.records = 0
+        self.stages = {}
+        self.records_per_page = {}
+
+    def page(self, kind, timings, records):
+        self.pages[kind] = self.pages.get(kind, 0) + 1
+        self.records += records
+        for stage in STAGES:
+            if stage not in timings:
+                continue
+            if (kind, stage) not in self.stages:
+                self.stages[(kind, stage)] = Histogram(PAGE_BUCKETS)
+            self.stages[(kind, stage)].observe(timings[stage])
+        if kind not in self.records_per_page:
+            self.records_per_page[kind] = Histogram(RECORD_BUCKETS)
+        self.records_per_page[kind].observe(records)
+
+    def as_dict(self):
+        seconds = {}
+        for (kind, stage), histogram in self.stages.items():
+            seconds.setdefault(kind, {})[stage] = histogram.as_dict()
+        return {
+            "pages": dict(self.pages),
+            "resumed_pages": self.resumed,
+            "records": self.records,
+            "page_seconds": seconds,
+            "records_per_page": {kind: histogram.as_dict() for kind, histogram in self.records_per_page.items()},
+        }
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.scrapers = {}
+        self.sheets = {}
+        self.sheet_errors = {}
+
+    def page(self, scraper, kind, timings, records):
+        with self.lock:
+            self.scrapers.setdefault(scraper, ScraperMetrics()).page(kind, timings, records)
+
+    def resumed(self, scraper, pages):
+        with self.lock:
+            self.scrapers.setdefault(scraper, ScraperMetrics()).resumed += pages
+
+    @contextmanager
+    def sheets_call(self, method):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self.lock:
+                self.sheet_errors[method] = self.sheet_errors.get(method, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.sheets.setdefault(method, Histogram(SHEETS_BUCKETS)).observe(elapsed)
+
+    def report(self, hosts=None):
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": time.time() - self.started_at,
+                "hosts": hosts or {},
+                "scrapers": {name: scraper.as_dict() for name, scraper in self.scrapers.items()},
+                "sheets": {
+                    method: dict(histogram.as_dict(), errors=self.sheet_errors.get(method, 0))
+                    for method, histogram in self.sheets.items()
+                },
+            }
+
+
+def write_atomic(path, text):
+    # The textfile collector may read at any moment, so never expose a half-written file.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_json(path, report):
+    write_atomic(path, json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def label_text(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def prometheus_text(report):
+    # The exposition format wants every sample of a metric family in one
+    # block, so samples are gathered per family and written out at the end.
+    families = {}
+    current = [None]
+
+    def declare(name, kind, help_text):
+        if name not in families:
+            families[name] = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        current[0] = name
+
+    def sample(name, labels, value):
+        families[current[0]].append(f"{name}{{{label_text(labels)}}} {value}" if labels else f"{name} {value}")
+
+    def histogram(name, help_text, labels, data):
+        declare(name, 'histogram', help_text)
+        for bound, count in data["buckets"]:
+            sample(name + '_bucket', dict(labels, le=bound), count)
+        sample(name + '_sum', labels, data["sum"])
+        sample(name + '_count', labels, data["count"])
+
+    declare('glossary_run_duration_seconds', 'gauge', "Wall-clock duration of the scrape run.")
+    sample('glossary_run_duration_seconds', {}, report["duration_seconds"])
+    declare('glossary_run_started_timestamp_seconds', 'gauge', "Unix time the scrape run started.")
+    sample('glossary_run_started_timestamp_seconds', {}, report["started_at"])
+
+    for host, stats in sorted(report["hosts"].items()):
+        labels = {"host": host}
+        for key, help_text in [("requests", "HTTP responses received."), ("retries", "Requests retried."),
+                               ("failures", "URLs given up on."), ("cache_hits", "Pages served from the HTTP cache."),
+                               ("bytes", "Response body bytes received."), ("throttles", "Times the host's request rate was cut.")]:
+            if key in stats:
+                declare(f'glossary_fetch_{key}_total', 'counter', help_text)
+                sample(f'glossary_fetch_{key}_total', labels, stats[key])
+        if "rate" in stats:
+            declare('glossary_fetch_rate', 'gauge', "Requests per second the host's token bucket allowed at the end of the run.")
+            sample('glossary_fetch_rate', labels, stats["rate"])
+        declare('glossary_fetch_responses_total', 'counter', "HTTP responses by status code.")
+        for status, count in sorted(stats["statuses"].items()):
+            sample('glossary_fetch_responses_total', dict(labels, status=status), count)
+        if "latency" in stats:
+            histogram('glossary_fetch_latency_seconds', "Time from request start to the full response body.", labels, stats["latency"])
+
+    for scraper, stats in sorted(report["scrapers"].items()):
+        labels = {"scraper": scraper}
+        declare('glossary_scraper_records_total', 'counter', "Records extracted.")
+        sample('glossary_scraper_records_total', labels, stats["records"])
+        declare('glossary_scraper_pages_total', 'counter', "Pages extracted, by page kind.")
+        for kind, count in sorted(stats["pages"].items()):
+            sample('glossary_scraper_pages_total', dict(labels, kind=kind), count)
+        declare('glossary_scraper_resumed_pages_total', 'counter', "Pages taken from the crawl state of an interrupted run.")
+        sample('glossary_scraper_resumed_pages_total', labels, stats["resumed_pages"])
+        for kind, stages in sorted(stats["page_seconds"].items()):
+            for stage, data in sorted(stages.items()):
+                histogram('glossary_page_seconds', "Per-page time spent decoding, parsing and extracting.", dict(labels, kind=kind, stage=stage), data)
+        for kind, data in sorted(stats["records_per_page"].items()):
+            histogram('glossary_records_per_page', "Records extracted from one page.", dict(labels, kind=kind), data)
+
+    for method, data in sorted(report["sheets"].items()):
+        labels = {"method": method}
+        histogram('glossary_sheets_call_seconds', "Duration of Sheets API calls.", labels, data)
+        declare('glossary_sheets_call_errors_total', 'counter', "Sheets API calls that raised.")
+        sample('glossary_sheets_call_errors_total', labels, data["errors"])
+
+    return "\n".join(line for lines in families.values() for line in lines) + "\n"
+
+
+def write_prometheus(path, report):
+    write_atomic(path, prometheus_text(report))
+
+
+def profiled(records, path):
+    # Profiles a scraper's record iterator in the thread that consumes it and
+    # dumps pstats to path when it is exhausted or abandoned.
+    profile = cProfile.Profile()
+    try:
+        while True:
+            profile.enable()
+            try:
+                record = next(records)
+            except StopIteration:
+                return
+            finally:
+                profile.disable()
+            yield record
+    finally:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profile.dump_stats(path)
+        print(f"Wrote profile to {path}")
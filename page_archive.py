@@ -0,0 +1,227 @@
+import argparse
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+# --- Raw page archive ---
+# Every page body a crawl fetches is appended to pages.warc.gz as a WARC/1.0
+# resource record, each record its own gzip member, so any one of them can be
+# decompressed on its own. An SQLite index maps each URL to the offset and
+# length of its records; reads slice a memory map of the archive. A body
+# identical to the URL's latest record is not stored again, so recrawls and
+# cache hits cost nothing. ArchiveFetcher serves these bodies in place of the
+# network, which lets a scraper's extraction be rerun offline.
+
+ARCHIVE_NAME = 'pages.warc.gz'
+INDEX_NAME = 'index.sqlite'
+
+
+def warc_record(url, body, stored_at):
+    date = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(stored_at))
+    header = (
+        "WARC/1.0\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {date}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        "Content-Type: application/octet-stream\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return gzip.compress(header.encode('utf-8') + body + b"\r\n\r\n", compresslevel=6, mtime=0)
+
+
+def record_body(data):
+    # The block of one decompressed WARC record.
+    payload = gzip.decompress(data)
+    header_end = payload.index(b"\r\n\r\n")
+    length = next(
+        int(line.split(b':', 1)[1])
+        for line in payload[:header_end].split(b"\r\n")
+        if line.lower().startswith(b'content-length:')
+    )
+    return payload[header_end + 4:header_end + 4 + length]
+
+
+class PageArchive:
+    def __init__(self, directory=os.path.join('.crawl', 'archive'), commit_every=200):
+        self.directory = directory
+        self.commit_every = commit_every
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, ARCHIVE_NAME)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, INDEX_NAME), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " url TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, digest TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS records_url ON records (url, stored_at)")
+        self.db.commit()
+        self.file = None
+        self.map = None
+        self.uncommitted = 0
+        self.stored = 0
+        self.unchanged = 0
+
+    def latest(self, url):
+        return self.db.execute(
+            "SELECT offset, length, digest FROM records WHERE url = ? ORDER BY stored_at DESC, offset DESC LIMIT 1", (url,)
+        ).fetchone()
+
+    def add(self, url, body):
+        # Fits Fetcher's on_response hook, which calls it from the scraper
+        # threads; the lock serialises the writes.
+        digest = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            latest = self.latest(url)
+            if latest is not None and latest[2] == digest:
+                self.unchanged += 1
+                return
+            if self.file is None:
+                self.file = open(self.path, 'ab')
+            stored_at = time.time()
+            data = warc_record(url, body, stored_at)
+            offset = self.file.tell()
+            self.file.write(data)
+            self.db.execute(
+                "INSERT INTO records (url, offset, length, size, digest, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, offset, len(data), len(body), digest, stored_at),
+            )
+            self.stored += 1
+            self.uncommitted += 1
+            if self.uncommitted >= self.commit_every:
+                self.commit()
+
+    def commit(self):
+        # Records reach the disk before the index rows pointing at them.
+        if self.file is not None:
+            self.file.flush()
+        self.db.commit()
+        self.uncommitted = 0
+
+    def read_at(self, offset, length):
+        if self.map is None or offset + length > len(self.map):
+            # The archive grew (or was never mapped): map it again.
+            if self.file is not None:
+                self.file.flush()
+            if self.map is not None:
+                self.map.close()
+            with open(self.path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return record_body(self.map[offset:offset + length])
+
+    def get(self, url):
+        # The latest body stored for url, or None.
+        with self.lock:
+            latest = self.latest(url)
+            if latest is None:
+                return None
+            return self.read_at(latest[0], latest[1])
+
+    def __contains__(self, url):
+        with self.lock:
+            return self.latest(url) is not None
+
+    def urls(self, prefix=''):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT DISTINCT url FROM records WHERE substr(url, 1, ?) = ? ORDER BY url", (len(prefix), prefix)
+            ).fetchall()
+        return [url for url, in rows]
+
+    def stats(self):
+        with self.lock:
+            records, urls, size = self.db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), COALESCE(SUM(size), 0) FROM records"
+            ).fetchone()
+        compressed = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {'records': records, 'urls': urls, 'bytes': size, 'compressed_bytes': compressed}
+
+    def close(self):
+        with self.lock:
+            self.commit()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.db.close()
+
+
+class ArchiveFetcher:
+    # Stands in for Fetcher when re-extracting: bodies come from the first
+    # archive holding the URL and pages never archived come back as None,
+    # just like failed fetches.
+    def __init__(self, archives):
+        self.archives = archives
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url):
+        for archive in self.archives:
+            body = archive.get(url)
+            if body is not None:
+                self.hits += 1
+                return body
+        self.misses += 1
+        return None
+
+    def fetch_many(self, urls, headers=None, concurrency=4, min_interval=0.5, ttl=0):
+        return [self.get(url) for url in urls]
+
+    def fetch(self, url, **kwargs):
+        return self.fetch_many([url], **kwargs)[0]
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        print(f"Read {self.hits} pages from the archive; {self.misses} were never archived.")
+        for archive in self.archives:
+            archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the raw page archive.")
+    parser.add_argument('--dir', default=os.environ.get('PAGE_ARCHIVE_DIR') or os.path.join('.crawl', 'archive'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    get_parser = subparsers.add_parser('get', help="write the latest archived body of a URL to stdout")
+    get_parser.add_argument('url')
+    list_parser = subparsers.add_parser('list', help="archived URLs, optionally under a prefix")
+    list_parser.add_argument('prefix', nargs='?', default='')
+    subparsers.add_parser('stats')
+    args = parser.parse_args()
+
+    archive = PageArchive(args.dir)
+    try:
+        if args.command == 'get':
+            body = archive.get(args.url)
+            if body is None:
+                sys.exit(f"{args.url} is not in the archive")
+            sys.stdout.buffer.write(body)
+        elif args.command == 'list':
+            for url in archive.urls(args.prefix):
+                print(url)
+        else:
+            for name, value in archive.stats().items():
+                print(f"{name}: {value}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import json
+import sys
+
+# --- Glossary records ---
+# One slotted Record per scraped term instead of a dict. The source name and
+# the initial repeat across thousands of records, so they are interned and
+# every record points at the same string. RecordColumns keeps a bulk
+# collection as one list per field and writes JSON lines straight from
+# those lists.
+
+FIELDS = ('term', 'reading', 'definition', 'src', 'url', 'initial')
+
+
+class Record:
+    __slots__ = FIELDS
+
+    def __init__(self, term, reading='', definition='', src='', url='', initial=None):
+        self.term = term or ''
+        self.reading = reading or ''
+        self.definition = definition or ''
+        self.src = sys.intern(src or '')
+        self.url = url or ''
+        self.initial = sys.intern(self.reading[:1] if initial is None else initial)
+
+    def __reduce__(self):
+        # Rebuilt through __init__, so records coming back from a parse
+        # worker are interned in this process too.
+        return (Record, self.values())
+
+    def values(self):
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __eq__(self, other):
+        # By content, so extraction results can be compared (compare_parsers).
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.values() == other.values()
+
+    # Records are filled in after construction (url, for one), so they
+    # compare by content but are not hashable.
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Record({self.term!r}, {self.reading!r}, src={self.src!r})"
+
+    @classmethod
+    def from_dict(cls, data, src='', initial=None):
+        # Accepts scraped records as well as rows from smbc_terms.json,
+        # glossary.json or the term store, which call the source 'source'.
+        # src and initial are fallbacks for rows that carry none.
+        return cls(
+            data.get('term'),
+            data.get('reading'),
+            data.get('definition'),
+            data.get('src') or data.get('source') or src,
+            data.get('url'),
+            data.get('initial') or initial,
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        return value if isinstance(value, Record) else cls.from_dict(value)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def sheet_row(self):
+        # Columns A-D of the glossary sheet: 頭文字, 用語集, 読み方, 意味.
+        return [self.initial, self.term, self.reading, self.definition]
+
+
+def to_json(value):
+    # json.dumps default= hook for results holding records.
+    if isinstance(value, Record):
+        return value.as_dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+class RecordColumns:
+    def __init__(self, records=()):
+        self.columns = tuple([] for _ in FIELDS)
+        self.extend(records)
+
+    def append(self, record):
+        for column, field in zip(self.columns, FIELDS):
+            column.append(getattr(record, field))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        return Record(*(column[index] for column in self.columns))
+
+    def __iter__(self):
+        for values in zip(*self.columns):
+            yield Record(*values)
+
+    def column(self, field):
+        return self.columns[FIELDS.index(field)]
+
+    def write_jsonl(self, f):
+        for values in zip(*self.columns):
+            f.write(json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False))
+            f.write('\n')
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+# --- Definition rewrite engine ---
+# The rule table is compiled once into literal replacements and a single
+# suffix check, with no regex work per definition. Results are memoized by
+# definition text, so the same text scraped from several sources (or seen
+# again later in the same run) is rewritten only once. The memo is an LRU
+# capped at memo_chars characters of definitions and results, so a long
+# crawl does not keep every definition it has seen.
+
+# (text, replacement, anchored): anchored rules only apply at the end of the
+# definition, like the old `re.sub(r'...$', ...)` passes.
+RULES = [
+    ("。です。", "。", False),
+    ("のことです。", "を意味します。", False),
+    ("といいます", "と呼ばれます。", True),
+    ("である", "を指します。", True),
+]
+
+DEFAULT_MAX_CHARS = 300
+DEFAULT_MEMO_CHARS = 4_000_000
+ELLIPSIS = "..."
+
+
+def compile_rules(rules):
+    # Unanchored rules become plain str.replace steps, applied in table order;
+    # anchored rules become one suffix -> replacement map checked with a
+    # single endswith() call.
+    replacements = [(text, replacement) for text, replacement, anchored in rules if not anchored]
+    suffixes = {}
+    for text, replacement, anchored in rules:
+        if anchored:
+            suffixes.setdefault(text, replacement)
+    return replacements, suffixes
+
+
+def is_continuation(ch):
+    # Characters that belong to the previous one: combining marks (e.g. a
+    # combining dakuten), variation selectors and zero-width joiners.
+    return bool(unicodedata.combining(ch)) or '\ufe00' <= ch <= '\ufe0f' or '\U000E0100' <= ch <= '\U000E01EF' or ch == '\u200d'
+
+
+def truncate(text, max_chars, ellipsis=ELLIPSIS):
+    if not max_chars or len(text) <= max_chars:
+        return text
+    end = max_chars
+    # Back off so a base character is never separated from what follows it.
+    while end > 0 and is_continuation(text[end]):
+        end -= 1
+    if end > 0 and text[end - 1] == '\u200d':
+        end -= 1
+    return text[:end] + ellipsis
+
+
+class DefinitionRewriter:
+    def __init__(self, rules=RULES, max_chars=DEFAULT_MAX_CHARS, ellipsis=ELLIPSIS, memo_chars=DEFAULT_MEMO_CHARS):
+        self.replacements, self.suffixes = compile_rules(rules)
+        self.suffix_tuple = tuple(self.suffixes)
+        self.max_chars = max_chars
+        self.ellipsis = ellipsis
+        self.memo = OrderedDict()
+        self.memo_chars = memo_chars
+        self.memo_size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _rewrite(self, definition):
+        text = definition
+        for old, new in self.replacements:
+            if old in text:
+                text = text.replace(old, new)
+        # Like a `$` anchor, a suffix may be followed by one final newline.
+        body, newline = (text[:-1], "\n") if text.endswith("\n") else (text, "")
+        if self.suffix_tuple and body.endswith(self.suffix_tuple):
+            for suffix, replacement in self.suffixes.items():
+                if body.endswith(suffix):
+                    text = body[:-len(suffix)] + replacement + newline
+                    break
+        return truncate(text, self.max_chars, self.ellipsis)
+
+    def rewrite(self, definition):
+        if not definition:
+            return ""
+        # Keyed on the text itself: str hashes are content hashes cached on the
+        # object, and cheaper than a digest, which costs more than the rewrite.
+        result = self.memo.get(definition)
+        if result is not None:
+            self.hits += 1
+            self.memo.move_to_end(definition)
+            return result
+        self.misses += 1
+        result = self._rewrite(definition)
+        size = len(definition) + len(result)
+        if size <= self.memo_chars:
+            self.memo[definition] = result
+            self.memo_size += size
+            while self.memo_size > self.memo_chars:
+                old, old_result = self.memo.popitem(last=False)
+                self.memo_size -= len(old) + len(old_result)
+        return result
+
+    def rewrite_many(self, definitions):
+        return [self.rewrite(definition) for definition in definitions]
+
+
+def reference_rephrase(definition, max_chars=DEFAULT_MAX_CHARS):
+    # The original pass-per-rule implementation, kept for the benchmark.
+    if not definition: return ""
+    new_def = definition.replace("。です。", "。").replace("のことです。", "を意味します。")
+    new_def = re.sub(r'といいます$', 'と呼ばれます。', new_def)
+    new_def = re.sub(r'である$', 'を指します。', new_def)
+    if len(new_def) > max_chars:
+        new_def = new_def[:max_chars] + "..."
+    return new_def
+
+
+def bench(path, repeat):
+    with open(path, encoding='utf-8') as f:
+        definitions = [item.get('definition') or '' for item in json.load(f)]
+    corpus = definitions * repeat
+
+    start = time.perf_counter()
+    expected = [reference_rephrase(definition) for definition in corpus]
+    reference_time = time.perf_counter() - start
+
+    rewriter = DefinitionRewriter()
+    start = time.perf_counter()
+    cold = rewriter.rewrite_many(corpus)
+    cold_time = time.perf_counter() - start
+    start = time.perf_counter()
+    rewriter.rewrite_many(corpus)
+    warm_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    uncached = [rewriter._rewrite(definition) if definition else "" for definition in corpus]
+    uncached_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, cold)) + sum(a != b for a, b in zip(expected, uncached))
+    print(f"{len(corpus)} definitions ({len(set(definitions))} distinct) from {path}")
+    for label, seconds in [("reference", reference_time), ("compiled", uncached_time), ("memoized (cold)", cold_time), ("memoized (warm)", warm_time)]:
+        print(f"  {label:16} {seconds * 1000:8.1f} ms  {len(corpus) / seconds:10.0f} defs/sec")
+    print(f"  memo: {len(rewriter.memo)} entries ({rewriter.memo_size} chars), {rewriter.hits} hits, {rewriter.misses} misses")
+    print(f"  output mismatches against the reference: {mismatches}")
+    return mismatches == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the definition rewrite engine against the original implementation.")
+    parser.add_argument('--input', default=os.path.join('glossary-site', 'src', 'data', 'glossary.json'))
+    parser.add_argument('--repeat', type=int, default=5, help="rewrite the corpus this many times")
+    args = parser.parse_args()
+    if not bench(args.input, args.repeat):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from urllib.robotparser import RobotFileParser
+
+# --- Adaptive per-host request scheduler ---
+# Each host gets a token bucket refilled at `rate` requests per second. The
+# rate starts from the scraper's min_interval, capped by robots.txt's
+# Crawl-delay / Request-rate, is cut multiplicatively on 429/503, Retry-After,
+# timeouts or latency well above the host's baseline, and grows again about
+# once a second while responses stay healthy. Crawl-delay is also the
+# ceiling: ramping up never goes past what the site asked for. Latency alone
+# never cuts the rate below where it started, and the baseline drifts up to
+# a host's steady latency so a slower but stable host can ramp up again.
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def robots_limits(text, user_agent='*'):
+    # Returns the minimum seconds between requests robots.txt asks for, or None.
+    parser = RobotFileParser()
+    parser.parse(text.splitlines())
+    delays = []
+    crawl_delay = parser.crawl_delay(user_agent)
+    if crawl_delay:
+        delays.append(float(crawl_delay))
+    request_rate = parser.request_rate(user_agent)
+    if request_rate and request_rate.requests:
+        delays.append(request_rate.seconds / request_rate.requests)
+    return max(delays) if delays else None
+
+
+class TokenBucket:
+    def __init__(self, rate, max_rate, min_rate=0.1, burst=1, decrease=0.5, latency_factor=2.0):
+        self.rate = min(rate, max_rate)
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, self.rate)
+        # The scraper's own rate: the floor for cuts caused by latency alone.
+        self.seed_rate = self.rate
+        self.burst = burst
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.step = max(0.05, self.rate * 0.1)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+        # Latency EWMA and the host's healthy baseline: it follows the EWMA
+        # down at once and up by baseline_drift of the gap per response.
+        self.latency = None
+        self.baseline = None
+        self.baseline_drift = 0.05
+        self.samples = 0
+        self.healthy = 0
+        self.last_decrease = 0.0
+        self.throttles = 0
+
+    def refill(self, now):
+        # The clock may already stand at the end of a Retry-After block.
+        if now <= self.updated:
+            return
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Tokens may go negative: each caller reserves its slot and sleeps
+        # until the bucket would have refilled to it. While Retry-After blocks
+        # the host the reservation clock starts at the end of the block, so
+        # the waiters queued behind it go out spaced by the rate, not at once.
+        async with self.lock:
+            now = time.monotonic()
+            start = max(now, self.blocked_until)
+            self.refill(start)
+            self.tokens -= 1
+            delay = start - now + max(-self.tokens / self.rate, 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def set_max_delay(self, seconds):
+        # Caps the rate at what robots.txt allows.
+        self.max_rate = min(self.max_rate, 1.0 / seconds)
+        self.rate = min(self.rate, self.max_rate)
+        self.min_rate = min(self.min_rate, self.rate)
+        self.seed_rate = min(self.seed_rate, self.rate)
+        self.step = min(self.step, max(0.05, self.rate * 0.1))
+
+    def throttle(self, retry_after=None, floor=None):
+        now = time.monotonic()
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.healthy = 0
+        # One cut per burst of failures: requests already in flight when the
+        # host started pushing back should not each halve the rate again.
+        if now - self.last_decrease < 1.0 / self.rate:
+            return
+        self.refill(now)
+        # A floor above the current rate (one set by an earlier 429) must not raise it.
+        self.rate = min(self.rate, max(floor or self.min_rate, self.rate * self.decrease))
+        self.tokens = min(self.tokens, 0.0)
+        self.last_decrease = now
+        self.throttles += 1
+
+    def success(self, latency=None):
+        # latency is None for responses whose timing says nothing about the
+        # host's load, such as 304 revalidations.
+        if latency is not None:
+            self.samples += 1
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.baseline is None or self.latency < self.baseline:
+                self.baseline = self.latency
+            else:
+                self.baseline += (self.latency - self.baseline) * self.baseline_drift
+            if self.samples >= 5 and self.latency > self.baseline * self.latency_factor + 0.05:
+                self.throttle(floor=max(self.min_rate, self.seed_rate))
+                return
+        self.healthy += 1
+        if self.healthy >= max(1.0, self.rate) and self.rate < self.max_rate:
+            # Slow start: until the host first pushes back the rate grows by
+            # half each round, after that by a fixed step.
+            self.refill(time.monotonic())
+            grown = self.rate * 1.5 if not self.throttles else self.rate + self.step
+            self.rate = min(self.max_rate, grown)
+            self.healthy = 0
@@ -0,0 +1,121 @@
+import json
+import os
+import re
+import zlib
+
+from merge import default_score, normalize_term
+from records import Record, RecordColumns
+from term_store import iter_file_records
+
+# --- Sharded crawls ---
+# A crawl can be split across n nodes. Every shard reads the index pages, but
+# shard i of n only fetches the detail pages whose canonical URL hashes to i
+# and keeps the records of the index pages that hash to i. Each shard writes
+# one JSON lines file per source, <src>.<i>-of-<n>.jsonl, and merge_shards
+# combines a directory of them.
+
+SHARD_FILE = re.compile(r'^(?P<src>.+)\.(?P<index>\d+)-of-(?P<count>\d+)\.jsonl$')
+
+
+def parse_shard(value):
+    # "i/n" -> (i, n) with 0 <= i < n.
+    index, sep, count = value.partition('/')
+    if not (sep and index.isdigit() and count.isdigit()) or int(index) >= int(count):
+        raise ValueError(f"expected i/n with 0 <= i < n, got {value!r}")
+    return int(index), int(count)
+
+
+def env_shard():
+    # Cloud Run jobs number their parallel tasks through these variables.
+    count = int(os.environ.get('CLOUD_RUN_TASK_COUNT', '1'))
+    if count <= 1:
+        return None
+    return int(os.environ.get('CLOUD_RUN_TASK_INDEX', '0')), count
+
+
+def shard_of(url, count):
+    # crc32 rather than hash(), which is salted per process.
+    return zlib.crc32(url.encode('utf-8')) % count
+
+
+def shard_path(path, shard):
+    # state.sqlite -> state.2-of-8.sqlite, so shards sharing a disk keep
+    # their own crawl state and reports.
+    if shard is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard[0]}-of-{shard[1]}{ext}"
+
+
+class ShardOutput:
+    # Each file is written as .part and renamed once the crawl is over, so a
+    # merge never reads a shard that is still running. Sources that produced
+    # no records still get an empty file, which marks the shard as done.
+    def __init__(self, directory, sources, shard=None):
+        self.directory = directory
+        self.sources = sources
+        self.shard = shard or (0, 1)
+        self.files = {}
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, src):
+        return os.path.join(self.directory, f"{src}.{self.shard[0]}-of-{self.shard[1]}.jsonl")
+
+    def write(self, record):
+        f = self.files.get(record.src)
+        if f is None:
+            f = self.files[record.src] = open(self.path(record.src) + '.part', 'w', encoding='utf-8')
+        f.write(json.dumps(record.as_dict(), ensure_ascii=False))
+        f.write('\n')
+        self.count += 1
+
+    def close(self):
+        for src in self.sources:
+            if src not in self.files:
+                self.files[src] = open(self.path(src) + '.part', 'w', encoding='utf-8')
+        for src, f in self.files.items():
+            f.close()
+            os.replace(self.path(src) + '.part', self.path(src))
+        return [self.path(src) for src in self.files]
+
+
+def shard_files(directory):
+    # Finished shard files in directory, warning about sources with shards
+    # missing or left over from a run split a different number of ways.
+    paths = []
+    found = {}
+    for name in sorted(os.listdir(directory)):
+        match = SHARD_FILE.match(name)
+        if match is None:
+            continue
+        paths.append(os.path.join(directory, name))
+        found.setdefault(match['src'], {}).setdefault(int(match['count']), set()).add(int(match['index']))
+    for src, counts in sorted(found.items()):
+        if len(counts) > 1:
+            print(f"{src}: shard files from runs split {', '.join(map(str, sorted(counts)))} ways; clear {directory} between runs")
+        for count, indexes in sorted(counts.items()):
+            missing = sorted(set(range(count)) - indexes)
+            if missing:
+                print(f"{src}: shards {', '.join(map(str, missing))} of {count} have not finished")
+    return paths
+
+
+def merge_shards(paths, store=None):
+    # Keeps the best record per term and source, the candidates the sheet
+    # writer chooses between. Every record also goes to the term store.
+    best = {}
+    count = 0
+    for path in paths:
+        for row in iter_file_records(path):
+            record = Record.from_dict(row)
+            count += 1
+            if store is not None:
+                store.upsert(record)
+            key = (normalize_term(record.term), record.src)
+            if not key[0]:
+                continue
+            current = best.get(key)
+            if current is None or default_score(record) > default_score(current):
+                best[key] = record
+    return count, RecordColumns(best.values())
@@ -0,0 +1,238 @@
+import base64
+import hashlib
+import json
+import os
+import random
+import time
+
+import gspread
+import requests
+from oauth2client.service_account import ServiceAccountCredentials
+
+from merge import normalize_term
+from rephrase import DefinitionRewriter
+
+# --- Glossary sheet access ---
+# One authorized gspread client per process, every API call retried with
+# backoff on quota and server errors, and writes grouped into as few
+# batch_update calls as the API's payload limits allow.
+
+SPREADSHEET_ID = '1JwA5HPNvMmNwADjyCDdNaRg2XPu2hzO9SFAo72qjBnw'
+WORKSHEET_NAME = 'シート1'
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Sheets accepts up to 10 MB per request but recommends staying near 2 MB.
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
+_client = None
+
+
+def authorized_client():
+    global _client
+    if _client is not None:
+        return _client
+    creds_path = '/Users/matsuyamakoichi/service-account.json' if os.path.exists('/Users/matsuyamakoichi/service-account.json') else 'service-account.json'
+
+    if not os.path.exists(creds_path):
+        creds_json = os.environ.get('GCP_SERVICE_ACCOUNT_JSON')
+        if creds_json:
+            try:
+                # Try base64 decoding first
+                decoded = base64.b64decode(creds_json).decode('utf-8')
+                with open('service-account.json', 'w') as f:
+                    f.write(decoded)
+                creds_path = 'service-account.json'
+            except Exception:
+                # If not base64, assume it's raw JSON
+                with open('service-account.json', 'w') as f:
+                    f.write(creds_json)
+                creds_path = 'service-account.json'
+        else:
+            return None
+
+    creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, SCOPE)
+    _client = gspread.authorize(creds)
+    return _client
+
+
+def open_worksheet():
+    client = authorized_client()
+    if client is None:
+        print("Credentials not found. Skipping sheet update.")
+        return None
+    return call_with_retry(lambda: client.open_by_key(SPREADSHEET_ID).worksheet(WORKSHEET_NAME))
+
+
+def call_with_retry(func, *args, retries=5, backoff_base=1.0, backoff_cap=64.0):
+    # Full-jitter exponential backoff on 429 / 5xx and dropped connections.
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except gspread.exceptions.APIError as e:
+            status = e.response.status_code
+            if status not in RETRY_STATUSES or attempt == retries:
+                raise
+            error = f"HTTP {status}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise
+            error = e.__class__.__name__
+        delay = random.uniform(0, min(backoff_cap, backoff_base * 2 ** attempt))
+        print(f"Sheets API call failed ({error}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+
+def content_hash(row):
+    return hashlib.sha1("\x1f".join(row).encode('utf-8')).hexdigest()[:16]
+
+
+def update_requests(rows, max_ranges=500, max_bytes=MAX_REQUEST_BYTES):
+    # Turns {row number: A:F values} into batch_update payloads. Consecutive
+    # rows share one range; a payload holds at most max_ranges ranges and
+    # about max_bytes of JSON, splitting a long range where needed.
+    payloads = []
+    ranges = []
+    size = 0
+    previous = None
+    for number in sorted(rows):
+        row = rows[number]
+        row_size = len(json.dumps(row, ensure_ascii=False).encode('utf-8'))
+        if ranges and size + row_size > max_bytes:
+            payloads.append(ranges)
+            ranges, size, previous = [], 0, None
+        if previous is not None and number == previous + 1:
+            ranges[-1][1] = number
+            ranges[-1][2].append(row)
+        else:
+            if len(ranges) >= max_ranges:
+                payloads.append(ranges)
+                ranges, size = [], 0
+            ranges.append([number, number, [row]])
+        size += row_size
+        previous = number
+    if ranges:
+        payloads.append(ranges)
+    return [[{'range': f'A{start}:F{end}', 'values': values} for start, end, values in ranges] for ranges in payloads]
+
+
+class SheetWriter:
+    # Upserts terms into the sheet, keyed on the normalized term. Only
+    # columns B (用語集), E (ソース) and F (ハッシュ) are read up front. New
+    # terms become new rows. A row from an earlier run is rewritten when the
+    # source that wrote it now produces different content, or when a record
+    # from another source beat that source's record in this run. Rows without
+    # a hash were written by hand and are never touched. Changes are buffered
+    # and sent every batch_size rows as a few batch_update calls of at most
+    # max_ranges ranges and max_bytes each.
+    def __init__(self, ws, batch_size=200, max_ranges=500, rewriter=None, metrics=None, max_bytes=MAX_REQUEST_BYTES):
+        self.ws = ws
+        self.rewriter = rewriter or DefinitionRewriter()
+        self.metrics = metrics
+        self.batch_size = batch_size
+        self.max_ranges = max_ranges
+        self.max_bytes = max_bytes
+        terms, meta = self.call('batch_get', ['B2:B', 'E1:F'])
+        header = meta[0] if meta else []
+        meta = meta[1:]
+        self.rows = {}
+        for i, row in enumerate(terms):
+            key = normalize_term(row[0]) if row else ""
+            if key and key not in self.rows:
+                src_hash = meta[i] if i < len(meta) else []
+                src = src_hash[0] if len(src_hash) > 0 else ""
+                digest = src_hash[1] if len(src_hash) > 1 else ""
+                self.rows[key] = (i + 2, src, digest)
+        self.next_row = max(len(terms), len(meta)) + 2
+        self.row_count = ws.row_count
+        self.written = set()
+        self.pending = {}
+        self.inserted = 0
+        self.updated = 0
+        if header[:2] != ['ソース', 'ハッシュ']:
+            self.call('update', [['ソース', 'ハッシュ']], 'E1:F1')
+
+    def call(self, method, *args):
+        # Every Sheets API call goes through here so it can be retried and timed.
+        func = getattr(self.ws, method)
+        if self.metrics is None:
+            return call_with_retry(func, *args)
+        with self.metrics.sheets_call(method):
+            return call_with_retry(func, *args)
+
+    def add(self, item, displaced=None):
+        # displaced is the record item replaced as best of its merge group.
+        key = normalize_term(item.term)
+        if not key:
+            return
+        row = item.sheet_row()
+        row[3] = self.rewriter.rewrite(row[3])
+        digest = content_hash(row)
+        if key in self.rows:
+            number, src, old_digest = self.rows[key]
+            if key not in self.written:
+                if not old_digest:
+                    return
+                if src != item.src and (displaced is None or displaced.src != src):
+                    return
+                if old_digest != digest:
+                    self.updated += 1
+            if old_digest == digest:
+                return
+        else:
+            number = self.next_row
+            self.next_row += 1
+            self.inserted += 1
+        self.queue(key, number, row + [item.src, digest])
+
+    def queue(self, key, number, row):
+        self.rows[key] = (number, row[4], row[5])
+        self.written.add(key)
+        self.pending[number] = row
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        last_row = max(self.pending)
+        if last_row > self.row_count:
+            self.call('add_rows', last_row - self.row_count)
+            self.row_count = last_row
+        for payload in update_requests(self.pending, self.max_ranges, self.max_bytes):
+            self.call('batch_update', payload)
+        print(f"Wrote {len(self.pending)} terms to the sheet.")
+        self.pending = {}
+
+
+class BulkLoader(SheetWriter):
+    # Loads curated rows as they are: no definition rewriting and no hash, so
+    # like hand-written rows the scrapers never overwrite them. Terms already
+    # in the sheet are kept unless overwrite is set; a term repeated in the
+    # input keeps its first row. Rows are buffered up to batch_size, so a
+    # large load costs one read, one add_rows and a few batch_update calls.
+    def __init__(self, ws, overwrite=False, batch_size=20000, metrics=None):
+        super().__init__(ws, batch_size=batch_size, metrics=metrics)
+        self.overwrite = overwrite
+        self.kept = 0
+        self.duplicates = 0
+
+    def add(self, item, displaced=None):
+        key = normalize_term(item.term)
+        if not key:
+            return
+        if key in self.written:
+            self.duplicates += 1
+            return
+        row = item.sheet_row() + [item.src, ""]
+        if key in self.rows:
+            if not self.overwrite:
+                self.kept += 1
+                return
+            number = self.rows[key][0]
+            self.updated += 1
+        else:
+            number = self.next_row
+            self.next_row += 1
+            self.inserted += 1
+        self.queue(key, number, row)
@@ -0,0 +1,43 @@
+# --- Shared syllabary for index pages ---
+# Glossary sites split their index by kana. The kana list lives here once and
+# each site picks the romanization its URLs use: kunrei (si, ti, tu, hu) or
+# hepburn (shi, chi, tsu, fu).
+
+GOJUON = [
+    'あ', 'い', 'う', 'え', 'お',
+    'か', 'き', 'く', 'け', 'こ',
+    'さ', 'し', 'す', 'せ', 'そ',
+    'た', 'ち', 'つ', 'て', 'と',
+    'な', 'に', 'ぬ', 'ね', 'の',
+    'は', 'ひ', 'ふ', 'へ', 'ほ',
+    'ま', 'み', 'む', 'め', 'も',
+    'や', 'ゆ', 'よ',
+    'ら', 'り', 'る', 'れ', 'ろ',
+    'わ',
+]
+
+# The first kana of every row (あ, か, さ, ...).
+ROW_HEADS = ['あ', 'か', 'さ', 'た', 'な', 'は', 'ま', 'や', 'ら', 'わ']
+
+KUNREI = {
+    'あ': 'a', 'い': 'i', 'う': 'u', 'え': 'e', 'お': 'o',
+    'か': 'ka', 'き': 'ki', 'く': 'ku', 'け': 'ke', 'こ': 'ko',
+    'さ': 'sa', 'し': 'si', 'す': 'su', 'せ': 'se', 'そ': 'so',
+    'た': 'ta', 'ち': 'ti', 'つ': 'tu', 'て': 'te', 'と': 'to',
+    'な': 'na', 'に': 'ni', 'ぬ': 'nu', 'ね': 'ne', 'の': 'no',
+    'は': 'ha', 'ひ': 'hi', 'ふ': 'hu', 'へ': 'he', 'ほ': 'ho',
+    'ま': 'ma', 'み': 'mi', 'む': 'mu', 'め': 'me', 'も': 'mo',
+    'や': 'ya', 'ゆ': 'yu', 'よ': 'yo',
+    'ら': 'ra', 'り': 'ri', 'る': 'ru', 'れ': 're', 'ろ': 'ro',
+    'わ': 'wa',
+}
+
+HEPBURN = dict(KUNREI, **{'し': 'shi', 'ち': 'chi', 'つ': 'tsu', 'ふ': 'fu'})
+
+ROMANIZATIONS = {'kunrei': KUNREI, 'hepburn': HEPBURN}
+
+
+def syllabary_urls(template, romanization='kunrei', kana=GOJUON):
+    # template holds a `{char}` placeholder for the romanized kana.
+    table = ROMANIZATIONS[romanization]
+    return [template.format(char=table[ch]) for ch in kana]
@@ -0,0 +1,255 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from merge import default_score, normalize_term
+from records import Record
+
+# --- Local term store ---
+# SQLite system of record for every scraped term: one row per (normalized
+# term, source), B-tree indexes on the normalized term and initial, and an
+# FTS5 index over term, reading and definition kept in sync by triggers.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL,
+    norm_term TEXT NOT NULL,
+    reading TEXT NOT NULL DEFAULT '',
+    initial TEXT NOT NULL DEFAULT '',
+    definition TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (norm_term, source)
+);
+CREATE INDEX IF NOT EXISTS terms_norm_term ON terms (norm_term);
+CREATE INDEX IF NOT EXISTS terms_initial ON terms (initial);
+CREATE TRIGGER IF NOT EXISTS terms_ai AFTER INSERT ON terms BEGIN
+    INSERT INTO terms_fts (rowid, term, reading, definition) VALUES (new.id, new.term, new.reading, new.definition);
+END;
+CREATE TRIGGER IF NOT EXISTS terms_ad AFTER DELETE ON terms BEGIN
+    INSERT INTO terms_fts (terms_fts, rowid, term, reading, definition) VALUES ('delete', old.id, old.term, old.reading, old.definition);
+END;
+CREATE TRIGGER IF NOT EXISTS terms_au AFTER UPDATE ON terms BEGIN
+    INSERT INTO terms_fts (terms_fts, rowid, term, reading, definition) VALUES ('delete', old.id, old.term, old.reading, old.definition);
+    INSERT INTO terms_fts (rowid, term, reading, definition) VALUES (new.id, new.term, new.reading, new.definition);
+END;
+"""
+
+COLUMNS = ['term', 'reading', 'initial', 'definition', 'source', 'url', 'content_hash', 'created_at', 'updated_at']
+
+
+def initial_of(reading):
+    return normalize_term(reading)[:1]
+
+
+def record_hash(term, reading, definition):
+    return hashlib.sha1("\x1f".join([term, reading, definition]).encode('utf-8')).hexdigest()[:16]
+
+
+class TermStore:
+    def __init__(self, path='terms.sqlite', commit_every=500):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        # The trigram tokenizer gives substring search over Japanese text,
+        # which has no spaces for the default tokenizer to split on.
+        tokenize = 'trigram' if sqlite3.sqlite_version_info >= (3, 34) else 'unicode61'
+        self.db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS terms_fts USING fts5("
+            f"term, reading, definition, content='terms', content_rowid='id', tokenize='{tokenize}')"
+        )
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def upsert(self, record):
+        # Returns 'inserted', 'updated' or None when nothing changed.
+        term = record.term
+        norm_term = normalize_term(term)
+        if not norm_term:
+            return None
+        reading = record.reading
+        definition = record.definition
+        source = record.src
+        digest = record_hash(term, reading, definition)
+        now = time.time()
+        row = self.db.execute(
+            "SELECT id, content_hash FROM terms WHERE norm_term = ? AND source = ?", (norm_term, source)
+        ).fetchone()
+        if row is None:
+            self.db.execute(
+                "INSERT INTO terms (term, norm_term, reading, initial, definition, source, url, content_hash, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (term, norm_term, reading, initial_of(reading), definition, source, record.url, digest, now, now),
+            )
+            status = 'inserted'
+        elif row['content_hash'] != digest:
+            self.db.execute(
+                "UPDATE terms SET term = ?, reading = ?, initial = ?, definition = ?, url = ?, content_hash = ?, updated_at = ?"
+                " WHERE id = ?",
+                (term, reading, initial_of(reading), definition, record.url, digest, now, row['id']),
+            )
+            status = 'updated'
+        else:
+            return None
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+        return status
+
+    def upsert_many(self, records):
+        counts = {'inserted': 0, 'updated': 0}
+        for record in records:
+            status = self.upsert(record)
+            if status:
+                counts[status] += 1
+        self.commit()
+        return counts
+
+    def commit(self):
+        self.db.commit()
+        self.uncommitted = 0
+
+    def _rows(self, sql, params=()):
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+    def contains(self, term):
+        return self.db.execute(
+            "SELECT 1 FROM terms WHERE norm_term = ? LIMIT 1", (normalize_term(term),)
+        ).fetchone() is not None
+
+    def lookup(self, term):
+        return self._rows(f"SELECT {', '.join(COLUMNS)} FROM terms WHERE norm_term = ?", (normalize_term(term),))
+
+    def by_initial(self, initial, limit=None):
+        sql = f"SELECT {', '.join(COLUMNS)} FROM terms WHERE initial = ? ORDER BY reading, term"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._rows(sql, (initial_of(initial),))
+
+    def search(self, query, limit=20):
+        query = query.strip()
+        if not query:
+            return []
+        columns = ', '.join(f"t.{column}" for column in COLUMNS)
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            return self._rows(
+                f"SELECT {columns} FROM terms_fts f JOIN terms t ON t.id = f.rowid"
+                " WHERE terms_fts MATCH ? ORDER BY rank LIMIT ?",
+                (phrase, limit),
+            )
+        # Trigrams need three characters; shorter queries fall back to a scan.
+        pattern = f"%{query}%"
+        return self._rows(
+            f"SELECT {columns} FROM terms t WHERE t.term LIKE ? OR t.reading LIKE ? OR t.definition LIKE ?"
+            " ORDER BY t.norm_term = ? DESC, length(t.term) LIMIT ?",
+            (pattern, pattern, pattern, normalize_term(query), limit),
+        )
+
+    def export(self, best=True, score=default_score):
+        # Yields every row, or with best=True only the best row per normalized term.
+        rows = self.db.execute(f"SELECT norm_term, {', '.join(COLUMNS)} FROM terms ORDER BY norm_term, id")
+        current_key = None
+        current = None
+        for row in rows:
+            record = dict(row)
+            record['src'] = record['source']
+            key = record.pop('norm_term')
+            if not best:
+                yield record
+                continue
+            record_score = score(Record.from_dict(record))
+            if key != current_key:
+                if current is not None:
+                    yield current
+                current_key, current, current_score = key, record, record_score
+            elif record_score > current_score:
+                current, current_score = record, record_score
+        if best and current is not None:
+            yield current
+
+    def stats(self):
+        total, terms = self.db.execute("SELECT COUNT(*), COUNT(DISTINCT norm_term) FROM terms").fetchone()
+        sources = dict(self.db.execute("SELECT source, COUNT(*) FROM terms GROUP BY source").fetchall())
+        return {'rows': total, 'terms': terms, 'sources': sources}
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def iter_file_records(path):
+    # JSON arrays (smbc_terms.json, glossary.json), JSON lines or CSV with a
+    # header row (curated_terms.csv); JSON lines and CSV are streamed.
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            yield from json.load(f)
+
+
+def read_records(path):
+    return list(iter_file_records(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and maintain the local term store.")
+    parser.add_argument('--db', default=os.environ.get('TERM_DB_PATH', 'terms.sqlite'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    search_parser = subparsers.add_parser('search', help="full-text search over term, reading and definition")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=20)
+    lookup_parser = subparsers.add_parser('lookup', help="every source's entry for a term")
+    lookup_parser.add_argument('term')
+    initial_parser = subparsers.add_parser('initial', help="terms under one initial (頭文字)")
+    initial_parser.add_argument('initial')
+    initial_parser.add_argument('--limit', type=int)
+    import_parser = subparsers.add_parser('import', help="load records from JSON, JSONL or CSV files")
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--source', help="source name for records that carry none")
+    export_parser = subparsers.add_parser('export', help="write terms as JSON lines to stdout")
+    export_parser.add_argument('--all', action='store_true', help="every source's row, not just the best per term")
+    subparsers.add_parser('stats')
+    args = parser.parse_args()
+
+    store = TermStore(args.db)
+    try:
+        if args.command == 'search':
+            rows = store.search(args.query, args.limit)
+        elif args.command == 'lookup':
+            rows = store.lookup(args.term)
+        elif args.command == 'initial':
+            rows = store.by_initial(args.initial, args.limit)
+        elif args.command == 'import':
+            for path in args.paths:
+                records = (Record.from_dict(row, args.source) for row in iter_file_records(path))
+                counts = store.upsert_many(records)
+                print(f"{path}: {counts['inserted']} inserted, {counts['updated']} updated")
+            return
+        elif args.command == 'export':
+            rows = store.export(best=not args.all)
+        else:
+            print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+            return
+        for row in rows:
+            sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import zlib
+
+import pytest
+
+from fetcher import Fetcher, HostPool
+
+
+class FailingSession:
+    def __init__(self, error):
+        self.error = error
+
+    def get(self, url, **kwargs):
+        raise self.error
+
+    async def close(self):
+        pass
+
+
+def fetch_with(monkeypatch, error):
+    monkeypatch.setattr(HostPool, 'get_session', lambda pool: FailingSession(error))
+    with Fetcher(retries=2, robots=False, max_rate=1000.0) as fetcher:
+        body = fetcher.fetch("https://example.jp/a.html", min_interval=0)
+        return body, fetcher.stats()["example.jp"]
+
+
+def test_undecodable_body_is_a_failed_fetch_without_retries(monkeypatch):
+    body, stats = fetch_with(monkeypatch, zlib.error("invalid stored block lengths"))
+    assert body is None
+    assert stats['failures'] == 1 and stats['retries'] == 0
+
+
+def test_programming_errors_propagate(monkeypatch):
+    with pytest.raises(TypeError):
+        fetch_with(monkeypatch, TypeError("unexpected keyword argument"))
@@ -0,0 +1,35 @@
+import threading
+
+from fetcher import Fetcher
+from http_cache import HttpCache
+from page_archive import ArchiveFetcher, PageArchive
+
+URL = "https://example.jp/terms/a.html"
+
+
+def test_archive_round_trip_and_dedup(tmp_path):
+    archive = PageArchive(str(tmp_path / 'archive'))
+    archive.add(URL, b'<p>one</p>')
+    archive.add(URL, b'<p>one</p>')
+    archive.add(URL, b'<p>two</p>')
+    assert archive.stored == 2 and archive.unchanged == 1
+    assert archive.get(URL) == b'<p>two</p>'
+    assert archive.get("https://example.jp/missing") is None
+    archive.close()
+    with ArchiveFetcher([PageArchive(str(tmp_path / 'archive'))]) as fetcher:
+        assert fetcher.fetch_many([URL, "https://example.jp/missing"]) == [b'<p>two</p>', None]
+
+
+def test_on_response_runs_in_caller_thread_and_failures_keep_the_body(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    cache.store(URL, b'<p>cached</p>')
+    threads = []
+
+    def hook(url, body):
+        threads.append(threading.current_thread())
+        raise OSError("No space left on device")
+
+    with Fetcher(cache=cache, on_response=hook, robots=False) as fetcher:
+        # A fresh cache hit: nothing goes over the network.
+        assert fetcher.fetch_many([URL], ttl=60) == [b'<p>cached</p>']
+    assert threads == [threading.current_thread()]
@@ -0,0 +1,33 @@
+import pickle
+import sys
+
+import pytest
+
+from records import Record
+
+
+def test_records_compare_by_content():
+    a = Record('投資信託', 'とうししんたく', '説明', 'MUFG')
+    b = Record('投資信託', 'とうししんたく', '説明', 'MUFG')
+    assert a == b
+    assert ([a], []) == ([b], [])
+    b.url = 'https://example.jp/x'
+    assert a != b
+
+
+def test_pickle_round_trip_keeps_content():
+    record = Record('株式', 'かぶしき', '説明', 'SMBC', 'https://example.jp/k')
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_records_are_not_hashable():
+    with pytest.raises(TypeError):
+        hash(Record('株式'))
+
+
+def test_from_dict_fallbacks_are_interned():
+    src = ''.join(['cur', 'ated'])
+    record = Record.from_dict({'term': '株式', 'reading': 'かぶしき'}, src, 'か')
+    assert record.src is sys.intern('curated')
+    assert record.initial == 'か'
+    assert Record.from_dict({'term': '株式', 'initial': 'K'}, initial='か').initial == 'K'
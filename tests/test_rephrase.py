@@ -0,0 +1,21 @@
+from rephrase import DefinitionRewriter, reference_rephrase
+
+
+def test_memo_is_bounded_and_evicts_least_recently_used():
+    rewriter = DefinitionRewriter(memo_chars=100)
+    definitions = [f"用語{i}のことです。" for i in range(50)]
+    for definition in definitions:
+        assert rewriter.rewrite(definition) == reference_rephrase(definition)
+    assert rewriter.memo_size <= 100
+    assert rewriter.memo_size == sum(len(key) + len(value) for key, value in rewriter.memo.items())
+    oldest, second = list(rewriter.memo)[:2]
+    rewriter.rewrite(oldest)
+    rewriter.rewrite("新しい定義である")
+    assert oldest in rewriter.memo
+    assert second not in rewriter.memo
+
+
+def test_oversized_definitions_are_not_memoized():
+    rewriter = DefinitionRewriter(max_chars=0, memo_chars=10)
+    assert rewriter.rewrite("長い" * 20) == "長い" * 20
+    assert not rewriter.memo
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import scheduler
+from scheduler import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(bucket, clock, latencies):
+    # One response per token: the clock advances by the current gap.
+    rates = []
+    for latency in latencies:
+        clock.now += 1.0 / bucket.rate
+        bucket.success(latency)
+        rates.append(bucket.rate)
+    return rates
+
+
+def test_slower_steady_latency_recovers(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, max_rate=8.0)
+    run(bucket, clock, [0.02] * 5)
+    rates = run(bucket, clock, [0.12] * 300)
+    # Latency alone never cuts below the scraper's seed rate...
+    assert min(rates) >= 2.0
+    # ...and once 120 ms is the new normal the rate ramps up again.
+    assert rates[-1] == 8.0
+    assert bucket.throttles <= 3
+
+
+def test_latency_spike_cuts_to_seed_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, max_rate=8.0)
+    run(bucket, clock, [0.02] * 40)
+    assert bucket.rate == 8.0
+    rates = run(bucket, clock, [0.5] * 10)
+    assert bucket.throttles >= 1
+    assert min(rates) == 2.0
+
+
+def test_revalidations_do_not_set_the_baseline(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, max_rate=8.0)
+    run(bucket, clock, [None] * 20)
+    assert bucket.baseline is None
+    run(bucket, clock, [0.12] * 50)
+    assert bucket.throttles == 0
+
+
+def test_throttle_still_cuts_below_seed_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    bucket = TokenBucket(rate=2.0, max_rate=8.0)
+    for _ in range(5):
+        clock.now += 10.0
+        bucket.throttle()
+    assert bucket.rate < 0.1 + 1e-9
+
+
+def test_waiters_are_spaced_after_retry_after(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(scheduler.asyncio, 'sleep', sleep)
+    bucket = TokenBucket(rate=2.0, max_rate=8.0)
+    clock.now += 10.0
+    bucket.throttle(retry_after=3.0)
+
+    async def waiters():
+        for _ in range(4):
+            await bucket.acquire()
+
+    asyncio.run(waiters())
+    # The rate was halved to 1/s: the first waiter goes when the block ends,
+    # the rest one interval apart.
+    assert delays == pytest.approx([3.0, 4.0, 5.0, 6.0])
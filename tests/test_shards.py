@@ -0,0 +1,58 @@
+import pytest
+
+from fetcher import Fetcher
+from frontier import Frontier
+from shards import parse_shard, shard_path
+
+URLS = [f"https://example.jp/terms/{i}.html" for i in range(200)]
+
+
+def crawl_order(frontier):
+    pages = []
+    while True:
+        kind, batch = frontier.next_batch(50)
+        if not batch:
+            return pages
+        pages.extend(url for url, hint in batch)
+
+
+def test_detail_pages_split_across_shards_index_pages_read_by_all():
+    shards = []
+    for i in range(3):
+        frontier = Frontier(shard=(i, 3))
+        frontier.add("https://example.jp/index.html", kind='index')
+        for url in URLS:
+            frontier.add(url)
+        shards.append(crawl_order(frontier))
+    details = [set(pages) - {"https://example.jp/index.html"} for pages in shards]
+    assert all("https://example.jp/index.html" in pages for pages in shards)
+    assert set().union(*details) == set(URLS)
+    assert sum(map(len, details)) == len(URLS)
+
+
+def test_split_index_shards_index_pages():
+    shards = []
+    for i in range(4):
+        frontier = Frontier(shard=(i, 4), split_index=True)
+        for url in URLS:
+            frontier.add(url, kind='index')
+        shards.append(crawl_order(frontier))
+    assert sorted(sum(shards, [])) == sorted(URLS)
+    assert all(shards)
+
+
+def test_shard_divides_host_limits():
+    with Fetcher(max_rate=8.0, shards=4, robots=False) as fetcher:
+        pool = fetcher.host_pool("example.jp", 4, 0.5)
+        assert pool.bucket.rate == 0.5
+        assert pool.bucket.max_rate == 2.0
+        assert pool.semaphore._value == 1
+
+
+def test_parse_shard():
+    assert parse_shard("2/8") == (2, 8)
+    for value in ("8/8", "2", "a/b", "-1/4"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+    assert shard_path("state.sqlite", (2, 8)) == "state.2-of-8.sqlite"
+    assert shard_path("state.sqlite", None) == "state.sqlite"
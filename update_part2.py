@@ -1,73 +0,0 @@
-
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-
-def update_glossary():
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name('/Users/matsuyamakoichi/service-account.json', scope)
-    client = gspread.authorize(creds)
-    
-    spreadsheet_id = '1JwA5HPNvMmNwADjyCDdNaRg2XPu2hzO9SFAo72qjBnw'
-    sh = client.open_by_key(spreadsheet_id)
-    worksheet = sh.worksheet('シート1')
-    
-    # [頭文字, 用語集, 読み方, 意味]
-    data = [
-        ["い", "インフレターゲット", "いんふれたーげっと", "中央銀行が物価上昇率に対して具体的な目標値を設定し、その数値を達成・維持するように金融政策を行う手法。"],
-        ["い", "インボイス制度", "いんぼいすせいど", "適格請求書等保存方式のこと。消費税の仕入税額控除を受けるために、登録事業者が発行する「適格請求書」の保存を義務付ける制度。"],
-        ["う", "受取手形", "うけとりてがた", "商取引の結果として代金の代わりに受け取った手形。将来の一定期日に記載された金額を受け取ることができる権利を表す。"],
-        ["う", "動く", "うごく", "相場の価格が変動すること。特に、それまでの停滞状態から活発な値動きが始まった際に使われることが多い。"],
-        ["う", "後付", "うしろづけ", "証券取引において、注文の執行後に本来は事前に決めるべき条件（顧客割り当てなど）を決定すること。不公正取引の原因となるため原則として禁止されている。"],
-        ["う", "薄商い", "うすあきない", "市場での取引高（売買高）が非常に少なく、活気がない状態。価格が飛びやすく、少しの注文で大きく変動するリスクがある。"],
-        ["う", "右肩上がり", "みぎかたあがり", "グラフ上で価格や業績が時間経過とともに右方向に上昇していく、安定した成長や上昇トレンドを示す状態。"],
-        ["う", "受渡日", "うけわたしび", "売買が成立（約定）した有価証券の代金の支払いと、証券の受け渡しが実際に行われる決済日のこと。一般的に約定日から起算して3営業日目となる。"],
-        ["う", "受渡代金", "うけわたしだいきん", "有価証券の売買が成立した際に、実際に決済される総額。約定代金に手数料や消費税、税金などを加減算して算出される。"],
-        ["う", "動の相場", "どうのそうば", "価格が激しく上下に動き、取引が非常に活発な相場状況のこと。"],
-        ["う", "売る", "うる", "保有している資産を手放して現金化すること、あるいは将来の下落を見越して空売りを行うこと。"],
-        ["う", "売り板", "うりいた", "板画面において、特定の価格帯に出されている売り注文の数量を表示した部分。"],
-        ["う", "売気配", "うりけはい", "買い手が見当たらず、売り注文だけが残っている状態の価格。市場の需給が「売り」に傾いていることを示す。"],
-        ["う", "売越", "うりこし", "ある一定期間における売買高において、買いよりも売りの数量や金額の方が多い状態。"],
-        ["う", "売シグナル", "うりしぐなる", "テクニカル分析などにおいて、価格が今後下落する可能性が高いとして「売るべき時」を示す指標の動き。"],
-        ["う", "売代", "うりだい", "信用取引の売り建てによって得られた売却代金。決済するまでの間、証券会社に担保として留保される。"],
-        ["う", "売建", "うりだて", "信用取引などで、将来の価格下落を見越して、まず「売る」注文から取引を開始すること。"],
-        ["う", "売逃", "うりにげ", "相場が崩れる前に、利益が出ているうちに素早く売却して市場から撤退すること。"],
-        ["う", "売抜", "うりぬけ", "保有している大量の株などを、相場に悪影響を与えないよう巧妙に全て売りさばくこと。"],
-        ["う", "上抜ける", "うわぬける", "これまでの持ち合い相場（レンジ）や上値を抑えていた抵抗線（レジスタンスライン）を価格が突き抜けて上昇すること。"],
-        ["う", "上向く", "うわむく", "停滞していた、あるいは下落していた相場が、上昇の兆しを見せて動き始めること。"],
-        ["う", "上回る", "うわまわる", "ある数値や成果が、予測値や前回の実績、あるいは基準となる指標を量的に超えること。"],
-        ["う", "上値", "うわね", "現在の価格よりも高い水準の価格。また、相場が上昇する際の到達点や限界点を指す。"],
-        ["う", "上値抵抗線", "うわねていこうせん", "チャート上で、これ以上の上昇を防ぐように作用している価格のライン。過去の高値同士を結んだ線などが該当する。"],
-        ["う", "上放れる", "うわばなれる", "一定の価格範囲で推移していた相場から、窓を開けて一気に高い価格帯へ飛び出すこと。強い上昇トレンドの開始とされる。"],
-        ["え", "営業利益", "えいぎょうりえき", "企業が本業のビジネスで稼ぎ出した利益のこと。売上高から売上原価と販売費及び一般管理費（販管費）を差し引いて算出される。"],
-        ["え", "益出し", "えきだし", "保有している有価証券などに利益が出ている状態で売却し、帳簿上の利益を現実の利益（利益確定）にすること。"],
-        ["え", "エコファンド", "えこふぁんど", "環境保護や社会的責任（ESG）に配慮した企業の株式を重点的に組み入れて運用する投資信託。"],
-        ["え", "エマージング市場", "えまーじんぐしじょう", "今後の高い経済成長が期待される新興諸国（中南米、東南アジア、東欧など）の証券市場。"],
-        ["え", "エリオット波動理論", "えりおっとはどうりろん", "相場には一定の周期性があり、上昇5波・下落3波の計8つの波を一つのサイクルとして繰り返すとするテクニカル分析の理論。"],
-        ["え", "円貨決済", "えんかけっさい", "外国株などの取引において、外貨ではなく日本円を用いて代金の支払いを行う決済方法。"],
-        ["え", "円貨", "えんか", "日本の通貨である「円」のこと。外貨に対して、国内通貨を指す。"],
-        ["え", "円金利", "えんきんり", "日本円の貸し借りに対して発生する利息の割合。国内の短期・長期金利を指す。"],
-        ["え", "円建", "えんだて", "取引の価格や資産の価値を日本円を基準として表示、あるいは決済すること。"],
-        ["え", "エンジェル税制", "えんじぇるぜいせい", "ベンチャー企業への投資を促進するため、個人投資家が特定の未上場企業に投資した際に所得税の優遇措置を受けられる制度。"],
-        ["え", "エンジェル投資家", "えんじぇるとうしか", "起業して間もないスタートアップ企業などに対し、成長を見越して資金提供や経営の助言を行う個人投資家。"],
-        ["え", "延滞金", "えんたいきん", "税金や利用料金などを期日までに支払わなかった場合に、その遅延期間に応じて課される罰則的な金銭。"],
-        ["え", "円安", "えんやす", "他国の通貨（主に米ドルなど）に対して、日本円の価値が相対的に低下すること。輸出企業には有利、輸入には不利に働くことが多い。"],
-        ["え", "円高", "えんだか", "他国の通貨に対して日本円の価値が相対的に上昇すること。輸入コストの低減につながるが、輸出企業の収益を圧迫する要因となる。"],
-        ["え", "エンディングノート", "えんでぃんぐのーと", "自身の病気や介護、葬儀、遺産相続などに関する希望を家族へ伝えるために書き記しておく備忘録。家族の負担を減らすための終活の一環とされる。"],
-        ["え", "エンハンスド運用", "えんはんすどうんよう", "基本的には指標（インデックス）に連動する運用を行いながら、リスクを抑えつつプラスアルファの収益（アルファ）を上乗せすることを目指す運用手法。"],
-        ["え", "エンベロープ", "えんべろーぷ", "移動平均線から上下に一定の乖離率（パーセント）を持たせた線を表示するテクニカル指標。現在の価格が移動平均からどれほど離れているかを測るのに用いられる。"],
-        ["お", "大型株", "おおがたかぶ", "東京証券取引所の区分において、時価総額と流動性が極めて高い上位100銘柄（TOPIX Core30およびLarge70）の銘柄。"],
-        ["お", "大型小売店販売額", "おおがたこうりてんはんばいがく", "百貨店やスーパーの店舗における売上高を集計した経済指標。個人消費の動向を測る材料の一つ。"],
-        ["お", "大引け", "おおびけ", "証券取引所における一日の最後の取引。または、その時の価格（終値）。"],
-        ["お", "押し目", "おしめ", "上昇トレンドにある相場が、一時的に利益確定売りなどで価格を下げる局面のこと。絶好の買い機会（押し目買い）とされる。"],
-        ["お", "押し目買い", "おしめがい", "上昇トレンド中の株価が一時的な調整で安くなったタイミングを狙って買いを入れる投資戦略。"],
-        ["お", "オーバーパフォーム", "おーばーぱふぉーむ", "特定の銘柄やファンドの収益率が、基準となる指標（ベンチマーク）を上回る状態。「アウトパフォーム」と同義。"],
-        ["お", "思惑", "おもわく", "投資家が独自の情報分析や直感に基づき、将来的な価格の動きを予測し期待すること。「思惑で買われる」などのように使われる。"],
-        ["お", "織り込む", "おりこむ", "将来予想される経済指標や出来事などのニュースが、あらかじめ現在の価格に反映されている状態。"]
-    ]
-    
-    # Write to sheet starting from row 52
-    worksheet.update('A52:D101', data)
-    print("Updated terms 51-100 successfully.")
-
-if __name__ == "__main__":
-    update_glossary()